@@ -0,0 +1,144 @@
+/* 순위표 페이지 스크립트 (데이터는 페이지의 #board-data JSON) */
+const BOARD = JSON.parse(document.getElementById('board-data').textContent);
+const aptLabels = BOARD.aptLabels;
+const aptDatasets = BOARD.aptDatasets;
+const avgLabels = BOARD.avgLabels;
+const avgValues = BOARD.avgValues;
+
+const COLORS = BOARD.colors;
+
+/* ── Chart.js: 아파트별 추이 ── */
+const ctx = document.getElementById('trendChart').getContext('2d');
+const datasets = aptDatasets.map((d, i) => ({
+    ...d,
+    borderColor: COLORS[i],
+    borderWidth: 1.5,
+    pointRadius: 0,
+    pointHoverRadius: 4,
+    backgroundColor: 'transparent',
+    tension: 0.3,
+    spanGaps: true,
+    _origColor: COLORS[i]
+}));
+
+const tc = new Chart(ctx, {
+    type: 'line',
+    data: { labels: aptLabels, datasets: datasets },
+    options: {
+        responsive: true, maintainAspectRatio: false,
+        interaction: { mode: 'index', intersect: false },
+        plugins: {
+            legend: { display: false },
+            tooltip: {
+                backgroundColor: '#1a1a1a', titleColor: '#fff',
+                bodyColor: '#ccc', borderColor: '#333', borderWidth: 1,
+                filter: function(item) { return item.raw !== null; },
+                callbacks: {
+                    label: function(c) {
+                        if (c.raw === null) return null;
+                        const v = c.raw;
+                        const b = Math.floor(v / 10000);
+                        const r = v % 10000;
+                        const p = b > 0 ? b + '억 ' + r.toLocaleString() + '만' : v.toLocaleString() + '만';
+                        return c.dataset.label + ': ' + p;
+                    }
+                }
+            }
+        },
+        scales: {
+            x: { ticks: { color: '#666', maxRotation: 45, maxTicksLimit: 12 }, grid: { color: '#222' } },
+            y: {
+                ticks: {
+                    color: '#666',
+                    callback: function(v) {
+                        const b = Math.floor(v / 10000);
+                        return b > 0 ? b + '억' : v.toLocaleString() + '만';
+                    }
+                },
+                grid: { color: '#222' }
+            }
+        }
+    }
+});
+
+/* ── 기간 토글 ── */
+function setRange(m) {
+    document.querySelectorAll('.toggle-btn').forEach(b => b.classList.remove('active'));
+    document.getElementById(m === 12 ? 'btn-1y' : m === 24 ? 'btn-2y' : 'btn-3y').classList.add('active');
+    tc.data.labels = aptLabels.slice(-m);
+    tc.data.datasets.forEach((ds, i) => {
+        ds.data = aptDatasets[i].data.slice(-m);
+    });
+    tc.update();
+}
+
+/* ── 클릭 인터랙션: 리스트 → 차트 하이라이트 ── */
+let activeIdx = -1;
+
+function highlightChart(idx) {
+    const label = document.getElementById('selectedLabel');
+    tc.data.datasets.forEach((ds, i) => {
+        if (i === idx) {
+            ds.borderWidth = 3.5;
+            ds.borderColor = ds._origColor;
+            ds.pointRadius = 3;
+            ds.pointBackgroundColor = ds._origColor;
+        } else {
+            ds.borderWidth = 1;
+            ds.borderColor = ds._origColor + '1A';
+            ds.pointRadius = 0;
+        }
+    });
+    label.textContent = aptDatasets[idx].label;
+    label.style.color = COLORS[idx];
+    label.classList.add('show');
+    tc.update();
+}
+
+function resetChart() {
+    const label = document.getElementById('selectedLabel');
+    tc.data.datasets.forEach((ds) => {
+        ds.borderWidth = 1.5;
+        ds.borderColor = ds._origColor;
+        ds.pointRadius = 0;
+    });
+    label.classList.remove('show');
+    tc.update();
+}
+
+function highlightRows(idx) {
+    document.querySelectorAll('.main-row').forEach((row, i) => {
+        if (i === idx) {
+            row.classList.add('active-row');
+            row.classList.remove('dimmed');
+        } else {
+            row.classList.remove('active-row');
+            row.classList.add('dimmed');
+        }
+    });
+}
+
+function resetRows() {
+    document.querySelectorAll('.main-row').forEach(row => {
+        row.classList.remove('active-row', 'dimmed');
+    });
+}
+
+function handleRowClick(idx) {
+    if (activeIdx === idx) {
+        activeIdx = -1;
+        resetChart();
+        resetRows();
+    } else {
+        activeIdx = idx;
+        highlightChart(idx);
+        highlightRows(idx);
+        document.getElementById('chartSection').scrollIntoView({ behavior: 'smooth', block: 'nearest' });
+    }
+    toggleDetail(idx + 1);
+}
+
+function toggleDetail(id) {
+    document.getElementById('detail-' + id).classList.toggle('show');
+    document.getElementById('arrow-' + id).classList.toggle('open');
+}
@@ -0,0 +1,746 @@
+"""
+fetch_all.py 벤치마크
+─────────────────────────────────────
+  python bench.py stages [--scales 1,10] [--save-baseline]
+                                      파이프라인 단계별 시간/처리량/최대 메모리
+  python bench.py workers [--max N]   CSV 병렬 파싱 스케일링 (1 → N 워커)
+  python bench.py table               dict 리스트 vs TxTable 메모리/시간 비교
+  python bench.py address             parse_address 캐시 없음 vs LRU 캐시
+  python bench.py backends [--scale N]
+                                      집계 python vs numpy 백엔드 시간 + 결과 동일성
+  python bench.py scanner             mmap 바이트 스캐너 vs csv 모듈 (레코드 동일성 + 시간)
+  python bench.py fetch [--rate MB/s] [--faults]
+                                      로컬 대역 서버에서 CSV 다운로드 순차 vs 동시
+                                      (+ 재시도/이어받기, 원본 동일성, 다운로드 중 파싱)
+  python bench.py api [--clients N] [--rounds N]
+                                      serve.py 조회 API: /top 전체 스캔 대조 + 동시 요청 지연시간
+                                      (캐시 없음 / LRU 적중 / If-None-Match 304)
+
+캐시는 사용하지 않고 매번 data/csv/ 전체를 새로 파싱한다.
+
+stages: scale 1 은 data/csv 그대로, scale N 은 각 CSV 를 N 배로 늘린
+합성 데이터 (사본마다 계약년도를 1년씩 과거로 이동 → N 년치 이력).
+결과는 bench_results.json 에 저장하고 bench_baseline.json 과 비교해
+허용 범위(--tolerance)를 넘고 --min-delta 초 이상 느려진 단계가 있으면 종료 코드 1.
+scale 100 은 임시 CSV 약 2.5GB 를 만든다.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import csv
+import glob
+import hashlib
+import http.server
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from urllib.parse import quote, unquote
+
+import fetch_all
+
+
+RESULTS_PATH = 'bench_results.json'
+BASELINE_PATH = 'bench_baseline.json'
+MIN_DELTA = 0.05  # 이보다 적게 느려진 단계는 비율과 무관하게 회귀로 보지 않음 (초)
+
+
+def write_scaled_csv(src, dst, scale):
+    """src CSV 의 데이터 행을 scale 배로 복제 (사본 k 는 계약년도 -k)"""
+    with open(src, 'rb') as f:
+        data = f.read()
+    enc = fetch_all.sniff_encoding(data[:fetch_all.SNIFF_BYTES])
+    text = fetch_all.decode_csv_text(data, enc, dict.fromkeys(fetch_all.ENCODING_STATS, 0))
+    rows = list(csv.reader(io.StringIO(text, newline='')))
+    head = next(i for i, r in enumerate(rows) if r and r[0] == 'NO') + 1
+    with open(dst, 'w', encoding=enc, newline='') as f:
+        w = csv.writer(f, quoting=csv.QUOTE_ALL, lineterminator='\n')
+        w.writerows(rows[:head])
+        for k in range(scale):
+            for r in rows[head:]:
+                if k and len(r) > 7 and r[7][:4].isdigit():
+                    r = list(r)
+                    r[7] = str(int(r[7][:4]) - k) + r[7][4:]
+                w.writerow(r)
+
+
+def dataset_files(scale, tmpdir):
+    files = sorted(glob.glob(os.path.join(fetch_all.CSV_DIR, '*.csv')))
+    if scale == 1:
+        return files
+    out = []
+    for i, f in enumerate(files):
+        dst = os.path.join(tmpdir, f"x{scale}_{i:02d}.csv")
+        write_scaled_csv(f, dst, scale)
+        out.append(dst)
+    return out
+
+
+def run_stage(name, fn, n_rows, memory=True):
+    """fn 을 시간 측정 후 (memory 면) tracemalloc 으로 한 번 더 실행"""
+    t0 = time.perf_counter()
+    out = fn()
+    dt = time.perf_counter() - t0
+    peak = None
+    if memory:
+        _, _, peak = _measure(fn)
+    rows = n_rows(out) if callable(n_rows) else n_rows
+    rec = {
+        'stage': name,
+        'seconds': round(dt, 4),
+        'rows': rows,
+        'rows_per_sec': round(rows / dt) if dt > 0 else None,
+        'peak_mb': round(peak, 1) if peak is not None else None,
+    }
+    mem = f"{peak:8.1f}MB" if peak is not None else ''
+    print(f"  {name:<22} {dt:8.3f}s  {rows:>10,}건  {rec['rows_per_sec'] or 0:>12,}건/s {mem}")
+    return out, rec
+
+
+def bench_stages(scale, memory=True):
+    """단일 scale 에 대해 단계별 측정 → 결과 dict 리스트"""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        files = dataset_files(scale, tmp)
+        mb = sum(os.path.getsize(f) for f in files) / 1e6
+        print(f"\n── scale x{scale}: CSV {len(files)}개 ({mb:.0f}MB) ──")
+
+        # 출력 파일은 임시 디렉토리로
+        fetch_all.DATA_DIR = tmp
+
+        def stage(name, fn, n_rows):
+            out, rec = run_stage(name, fn, n_rows, memory)
+            rec['scale'] = scale
+            results.append(rec)
+            return out
+
+        def parse():
+            fetch_all.ADDRESS_RESOLVER.resolve.cache_clear()
+            return [row for f in files for row in fetch_all.read_csv_rows(f)]
+        rows = stage('load_csv_file', parse, len)
+
+        addrs = csv_addresses(files)
+
+        def resolve():
+            resolver = fetch_all.AddressResolver()
+            return [resolver.resolve(a) for a in addrs]
+        stage('parse_address', resolve, len(addrs))
+
+        def dedup():
+            idx = fetch_all.DedupIndex()
+            return [r for r in rows if idx.add(r)]
+        unique = stage('dedup', dedup, len(rows))
+        del rows
+
+        table = fetch_all.TxTable()
+        for r in unique:
+            table.append(r)
+        n = len(unique)
+        del unique
+
+        # 최근 6개월 = 데이터상 마지막 6개월 (실행 날짜와 무관하게 비교 가능하도록)
+        recent = set(sorted(set(table.ym))[-6:])
+        boards = {'bench': (set(fetch_all.REGIONS), 20)}
+
+        def aggregate():
+            return fetch_all.MonthlyAggregate(
+                recent, fetch_all.DISTRICT_TOP_N, boards).feed_table(table)
+        agg = stage('aggregate', aggregate, n)
+
+        def district():
+            fetch_all.PAYLOAD_HASHES.clear()  # 매번 실제로 생성하도록
+            with contextlib.redirect_stdout(io.StringIO()):
+                return fetch_all.build_district_data(agg)
+        fetch_all.ARTIFACTS.clear()
+        stage('build_district_data', district, n)
+
+        def compress():
+            with contextlib.redirect_stdout(io.StringIO()):
+                return fetch_all.write_manifest(fetch_all.ARTIFACTS)
+        stage('compress_artifacts', compress, len)
+
+        t20 = agg.board('bench')
+        keys = [(it['region_code'], it['apt_name']) for it in t20]
+        apt_months, apt_series = stage(
+            'board_per_apt_monthly', lambda: fetch_all.board_per_apt_monthly(agg, t20), len(t20))
+
+        mavg = fetch_all.board_monthly_avg(agg, keys)
+        rd = fetch_all.board_region_dist(t20)
+        rch = fetch_all.board_rank_changes(t20, os.path.join(tmp, 'previous_rank.json'))
+        ins = fetch_all.board_insights(t20, mavg)
+        stage('gen_leaderboard_html',
+              lambda: fetch_all.gen_leaderboard_html('전국', t20, rch, mavg, rd, ins, '',
+                                                     apt_months, apt_series),
+              len(t20))
+    fetch_all.DATA_DIR = 'data'
+    return results
+
+
+def compare_baseline(results, baseline, tolerance, min_delta=MIN_DELTA):
+    """
+    기준 대비 느려진 단계 출력 → 회귀 개수
+    비율이 허용 범위를 넘고 절대 시간도 min_delta 초 넘게 늘어야 회귀
+    (수 ms 단계의 측정 잡음이 회귀로 잡히지 않도록)
+    """
+    base = {(r['scale'], r['stage']): r for r in baseline}
+    regressions = 0
+    print(f"\n── 기준 대비 (허용 +{tolerance:.0%}, +{min_delta * 1e3:.0f}ms 이상) ──")
+    for r in results:
+        b = base.get((r['scale'], r['stage']))
+        if not b or not b['seconds']:
+            print(f"  x{r['scale']:<4} {r['stage']:<22} (기준 없음: --save-baseline 으로 갱신)")
+            continue
+        ratio = r['seconds'] / b['seconds']
+        flag = ''
+        if ratio > 1 + tolerance and r['seconds'] - b['seconds'] > min_delta:
+            flag = '  ⚠️ 회귀'
+            regressions += 1
+        print(f"  x{r['scale']:<4} {r['stage']:<22} {b['seconds']:8.3f}s → {r['seconds']:8.3f}s"
+              f"  x{ratio:4.2f}{flag}")
+    return regressions
+
+
+def bench_all_stages(scales, memory, save_baseline, tolerance, min_delta=MIN_DELTA):
+    results = []
+    for sc in scales:
+        results.extend(bench_stages(sc, memory))
+
+    with open(RESULTS_PATH, 'w', encoding='utf-8') as f:
+        json.dump({'created': time.strftime('%Y-%m-%d %H:%M'), 'results': results},
+                  f, ensure_ascii=False, indent=2)
+    print(f"\n  → {RESULTS_PATH} 저장")
+
+    if save_baseline:
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump({'created': time.strftime('%Y-%m-%d %H:%M'), 'results': results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"  → {BASELINE_PATH} 갱신")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print(f"  (기준 파일 {BASELINE_PATH} 없음: --save-baseline 으로 생성)")
+        return 0
+    with open(BASELINE_PATH, encoding='utf-8') as f:
+        baseline = json.load(f)['results']
+    return 1 if compare_baseline(results, baseline, tolerance, min_delta) else 0
+
+
+def bench_workers(max_workers):
+    """워커 수별 parse_csv_files 시간 측정 + 결과 동일성 확인"""
+    files = sorted(glob.glob(os.path.join(fetch_all.CSV_DIR, '*.csv')))
+    if not files:
+        print(f"❌ {fetch_all.CSV_DIR}/ 에 CSV 파일이 없습니다")
+        return
+    mb = sum(os.path.getsize(f) for f in files) / 1e6
+    print(f"📂 CSV {len(files)}개 ({mb:.1f}MB), CPU {os.cpu_count()}개\n")
+
+    base_time = None
+    base_blobs = None
+    counts = sorted({1, 2, 4, 8, max_workers} & set(range(1, max_workers + 1)))
+    for w in counts:
+        t0 = time.perf_counter()
+        blobs = fetch_all.parse_csv_files(files, workers=w)
+        dt = time.perf_counter() - t0
+        if base_blobs is None:
+            base_time, base_blobs = dt, blobs
+        same = '✅' if blobs == base_blobs else '❌ 결과 불일치'
+        print(f"  workers={w:<3} {dt:6.2f}s  x{base_time / dt:4.2f}  {same}")
+
+
+def _measure(fn):
+    """fn() 실행 → (결과, 초, tracemalloc 최대 MB)"""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = fn()
+    dt = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return out, dt, peak
+
+
+def bench_table():
+    """행별 dict 리스트(기존 방식) vs 컬럼형 TxTable: 적재 + 6개월 필터"""
+    files = sorted(glob.glob(os.path.join(fetch_all.CSV_DIR, '*.csv')))
+    months = fetch_all.get_months(6)
+    months_str = set(months)
+    months_code = {int(m) for m in months}
+
+    def dict_path():
+        items = []
+        for f in files:
+            items.extend(fetch_all.load_csv_file(f))
+        recent = [it for it in items
+                  if f"{it['deal_year']}{it['deal_month'].zfill(2)}" in months_str]
+        return len(items), len(recent)
+
+    def table_path():
+        table = fetch_all.TxTable()
+        for f in files:
+            for it in fetch_all.load_csv_file(f):
+                table.append(tuple(it.values()))
+        recent = table.select(months=months_code)
+        return len(table), len(recent)
+
+    print(f"📂 CSV {len(files)}개\n")
+    for name, fn in (('dict', dict_path), ('TxTable', table_path)):
+        (n, r), dt, peak = _measure(fn)
+        print(f"  {name:<8} {n}건 (최근 6개월 {r}건)  {dt:6.2f}s  최대 {peak:7.1f}MB")
+
+
+def csv_addresses(files):
+    """CSV '시군구' 컬럼 원문 리스트 (헤더 이후 행 전부)"""
+    out = []
+    for f in files:
+        with open(f, 'rb') as fh:
+            data = fh.read()
+        enc = fetch_all.sniff_encoding(data[:fetch_all.SNIFF_BYTES])
+        text = fetch_all.decode_csv_text(data, enc, dict.fromkeys(fetch_all.ENCODING_STATS, 0))
+        header = False
+        for row in csv.reader(io.StringIO(text, newline='')):
+            if not header:
+                header = bool(row) and row[0] == 'NO'
+                continue
+            if len(row) > 1:
+                out.append(row[1])
+    return out
+
+
+def bench_address():
+    """트라이 직접 호출(캐시 없음) vs LRU 캐시 경유"""
+    files = sorted(glob.glob(os.path.join(fetch_all.CSV_DIR, '*.csv')))
+    addrs = csv_addresses(files)
+    print(f"📂 주소 {len(addrs)}건 (고유 {len(set(addrs))}개)\n")
+
+    resolver = fetch_all.AddressResolver()
+    t0 = time.perf_counter()
+    raw = [resolver._resolve(a) for a in addrs]
+    t_raw = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    cached = [resolver.resolve(a) for a in addrs]
+    t_cached = time.perf_counter() - t0
+
+    st = resolver.stats()
+    same = '✅' if raw == cached else '❌ 결과 불일치'
+    print(f"  캐시 없음  {t_raw * 1e3:7.1f}ms  {len(addrs) / t_raw:10,.0f}건/s")
+    print(f"  LRU 캐시   {t_cached * 1e3:7.1f}ms  {len(addrs) / t_cached:10,.0f}건/s  {same}")
+    print(f"  적중 {st['hits']} / 미스 {st['misses']} (캐시 {st['size']}/{st['maxsize']})")
+
+
+def aggregate_snapshot(agg):
+    """집계 결과 비교용: 상태 + 반올림된 출력값 (dict 삽입 순서 포함)"""
+    return {
+        'cells': list(agg.cells.items()),
+        'best': list(agg.best.items()),
+        'rows': list(agg.rows.items()),
+        'recent': list(agg.recent.items()),
+        'months': agg.months,
+        'tops': [(r, top.keys()) for r, top in agg.tops.items()],
+        'boards': {name: agg.board(name) for name in agg.boards},
+        'series': [agg.series(r, a) for r, a in agg.best],
+        'pooled': agg.pooled_avg(list(agg.best)),
+    }
+
+
+def bench_backends(scale):
+    """MonthlyAggregate.feed_table: python(행 단위) vs numpy(벡터) 시간 + 결과 동일성"""
+    if fetch_all.np is None:
+        print("❌ NumPy 가 설치돼 있지 않아 numpy 백엔드를 비교할 수 없습니다")
+        return 1
+    with tempfile.TemporaryDirectory() as tmp:
+        table = fetch_all.TxTable()
+        for f in dataset_files(scale, tmp):
+            for row in fetch_all.read_csv_rows(f):
+                table.append(row)
+    recent = set(sorted(set(table.ym))[-6:])
+    boards = {name: (codes, n) for name, (_t, codes, n) in fetch_all.LEADERBOARDS.items()}
+    boards['all'] = (set(fetch_all.REGIONS), 20)
+    print(f"📂 scale x{scale}: {len(table):,}건\n")
+
+    snaps = {}
+    for backend in ('python', 'numpy'):
+        agg = fetch_all.MonthlyAggregate(recent, fetch_all.DISTRICT_TOP_N, boards, backend=backend)
+        t0 = time.perf_counter()
+        agg.feed_table(table)
+        dt = time.perf_counter() - t0
+        snaps[backend] = aggregate_snapshot(agg)
+        print(f"  {backend:<7} {dt:7.3f}s  {len(table) / dt:12,.0f}건/s  셀 {len(agg.cells):,}개")
+
+    diff = [k for k in snaps['python'] if snaps['python'][k] != snaps['numpy'][k]]
+    print(f"\n  {'✅ 결과 동일' if not diff else '❌ 결과 불일치: ' + ', '.join(diff)}")
+    return 1 if diff else 0
+
+
+def write_edge_csv(path):
+    """
+    scan_csv_rows 의 느린 경로를 모두 거치는 cp949 CSV
+    (따옴표 / 여러 줄 필드, 따옴표 없는 행, 전각 숫자, 전각 공백, 깨진 바이트, 빈 줄)
+    """
+    def row(name='래미안', addr='서울특별시 강남구 역삼동', area='84.97', ym='202601',
+            price='150,000', floor='12', road='테헤란로 1', cancel='-'):
+        return [str(1), addr, '1', '0001', '0000', name, area, ym, '15', price, '-', floor,
+                '개인', '개인', '2005', road, cancel, '중개거래', '서울 강남구', '-']
+
+    def line(fields):
+        return ','.join('"' + f.replace('"', '""') + '"' for f in fields).encode('cp949') + b'\n'
+
+    rows = [
+        line(row()),
+        line(row(name='"큰따옴표" 아파트')),
+        line(row(road='테헤란로\n2 (여러 줄)')),
+        ','.join(row(name='따옴표없음', price='99000')).encode('cp949') + b'\n',
+        line(row(area='８４.５')),                       # 전각 숫자: str 경로에서만 변환됨
+        line(row(name='　공백 단지　')),          # 전각 공백: str.strip 으로 제거
+        line(row(addr='세종특별자치시  종촌동')),
+        line(row(price='abc')),
+        line(row(cancel='26.01.20')),
+        line(row(ym='202412')),
+        b'\n',
+        line(row(name='깨짐')).replace('깨짐'.encode('cp949'), b'\xff\xfe'),   # 쓰는 컬럼에서 디코딩 실패
+        line(row(name='뒤깨짐')).replace('서울 강남구'.encode('cp949'), b'\xff'),  # 안 쓰는 컬럼에서 실패
+    ]
+    head = line(['NO', '시군구', '번지', '본번', '부번', '단지명', '전용면적(㎡)', '계약년월', '계약일',
+                 '거래금액(만원)', '동', '층', '매수자', '매도자', '건축년도', '도로명', '해제사유발생일',
+                 '거래유형', '중개사소재지', '등기일자'])
+    with open(path, 'wb') as f:
+        f.write('"□ 국토교통부 실거래가 공개시스템"\n" 검색조건"\n'.encode('cp949'))
+        f.write(head)
+        f.writelines(rows)
+
+
+def bench_scanner():
+    """
+    scan_csv_rows (mmap 바이트 스캐너) vs iter_csv_rows_text (전체 디코딩 + csv 모듈)
+    data/csv 전체 + 경계 사례 CSV 에서 필터 조건별로 레코드가 같은지 확인하고 시간 비교
+    """
+    recent = int(sorted(fetch_all.get_months(12))[0])
+    specs = {
+        '전체': None,
+        '서울': fetch_all.RowFilter(regions=fetch_all.SEOUL_CODES),
+        f'{recent}~ 해제 제외': fetch_all.RowFilter(ym_min=recent, exclude_cancelled=True),
+        '컬럼 선택': fetch_all.RowFilter(columns=('apt_name',)),
+    }
+    impls = {'csv 모듈': fetch_all.iter_csv_rows_text, 'mmap 스캐너': fetch_all.scan_csv_rows}
+    files = sorted(glob.glob(os.path.join(fetch_all.CSV_DIR, '*.csv')))
+    mb = sum(os.path.getsize(f) for f in files) / 1e6
+    print(f"📂 CSV {len(files)}개 ({mb:.0f}MB) + 경계 사례 1개\n")
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        edge = os.path.join(tmp, 'edge.csv')
+        write_edge_csv(edge)
+        for label, spec in specs.items():
+            out, times = {}, {}
+            for name, fn in impls.items():
+                fetch_all.ADDRESS_RESOLVER.resolve.cache_clear()
+                stats = dict.fromkeys(fetch_all.ENCODING_STATS, 0)
+                t0 = time.perf_counter()
+                out[name] = [list(fn(f, stats, spec)) for f in files + [edge]]
+                times[name] = time.perf_counter() - t0
+            a, b = out.values()
+            same = a == b
+            ok &= same
+            n = sum(map(len, a))
+            line = '  '.join(f"{k} {v:6.3f}s" for k, v in times.items())
+            print(f"  {label:<16} {n:>9,}건  {line}  x{times['csv 모듈'] / times['mmap 스캐너']:.2f}"
+                  f"  {'✅ 동일' if same else '❌ 불일치'}")
+            if not same:
+                for f, ra, rb in zip(files + [edge], a, b):
+                    if ra != rb:
+                        diff = next((x, y) for x, y in zip(ra + [None], rb + [None]) if x != y)
+                        print(f"    {os.path.basename(f)}: {diff}")
+    return 0 if ok else 1
+
+
+class CsvHandler(http.server.BaseHTTPRequestHandler):
+    """
+    MOLIT 다운로드 대역 서버: data/csv 를 keep-alive + Range/If-Range 로 제공
+    rate(바이트/초)로 전송 속도를 제한하고, faults 에 든 파일은 첫 요청에서
+    503 또는 전송 도중 연결 끊김을 한 번 일으킨다.
+    """
+    protocol_version = 'HTTP/1.1'
+    files = {}    # 이름 → (바이트, ETag)
+    rate = 0
+    faults = {}   # 이름 → '503' | 'drop' (한 번 쓰면 제거)
+    requests = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        type(self).requests += 1
+        name = unquote(self.path.lstrip('/'))
+        if name not in self.files:
+            self.send_error(404)
+            return
+        data, etag = self.files[name]
+        fault = self.faults.pop(name, None)
+        if fault == '503':
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        start = 0
+        m = re.match(r'bytes=(\d+)-$', self.headers.get('Range', ''))
+        if m and self.headers.get('If-Range', etag) == etag:
+            start = int(m.group(1))
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{len(data)}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+        body = data[start:]
+        self.send_response(206 if start else 200)
+        if start:
+            self.send_header('Content-Range', f'bytes {start}-{len(data) - 1}/{len(data)}')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.end_headers()
+
+        if fault == 'drop':
+            body = body[:len(body) // 2]
+            self.close_connection = True
+        step = 64 * 1024
+        for i in range(0, len(body), step):
+            self.wfile.write(body[i:i + step])
+            if self.rate:
+                time.sleep(step / self.rate)
+
+
+@contextlib.contextmanager
+def csv_server(files, rate, faults):
+    """files 를 제공하는 로컬 HTTP 서버 → base URL"""
+    handler = type('Handler', (CsvHandler,), {
+        'files': {os.path.basename(f): _with_etag(f) for f in files},
+        'rate': rate,
+        'faults': dict(faults),
+        'requests': 0,
+    })
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}/', handler
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _with_etag(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    return data, '"' + hashlib.sha1(data).hexdigest()[:16] + '"'
+
+
+def bench_fetch(rate_mb, faults):
+    """
+    로컬 대역 서버에서 data/csv 를 내려받아 순차(연결 1개) vs 동시 다운로드 시간 비교
+    받은 파일이 원본과 바이트 단위로 같은지, 동시 모드에서 파싱이 다운로드와 겹쳤는지 확인
+    faults: 파일마다 503 / 전송 중 끊김을 한 번씩 넣어 재시도·이어받기 경로 검증
+    """
+    files = sorted(glob.glob(os.path.join(fetch_all.CSV_DIR, '*.csv')))
+    mb = sum(os.path.getsize(f) for f in files) / 1e6
+    print(f"📂 CSV {len(files)}개 ({mb:.0f}MB), 파일당 {rate_mb}MB/s 로 제공\n")
+    plan = {}
+    if faults:
+        plan = {os.path.basename(f): ('503', 'drop')[i % 2] for i, f in enumerate(files)}
+
+    ok = True
+    for label, conns in (('순차', 1), ('동시', fetch_all.FETCH_CONNECTIONS * 3)):
+        with csv_server(files, rate_mb * 1e6, plan) as (base, handler), \
+                tempfile.TemporaryDirectory() as tmp:
+            sources = [{'name': os.path.basename(f), 'sido': f'{i:02d}',
+                        'url': base + quote(os.path.basename(f))}
+                       for i, f in enumerate(files)]
+            cache = fetch_all.CsvCache(os.path.join(tmp, 'cache.pkl'), rebuild=True)
+            out = os.path.join(tmp, 'csv')
+            print(f"── {label} (연결 {conns}개) ──")
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                st = fetch_all.fetch_csv(sources, out, cache, connections=conns, backoff=0.05)
+            dt = time.perf_counter() - t0
+            same = all(fetch_all.file_sha1(f) == fetch_all.file_sha1(
+                os.path.join(out, os.path.basename(f))) for f in files)
+            cached = sum(1 for f in sources if os.path.join(out, f['name']) in cache.entries)
+            ok &= same and not st['failed'] and cached == len(files)
+            print(f"  {dt:6.2f}s (파일별 합 {st['serial_seconds']:.2f}s,"
+                  f" 가장 느린 파일 {st['slowest_seconds']:.2f}s)"
+                  f"  요청 {handler.requests} / 연결 {st['connections']}"
+                  f"  재시도 {st['retries']} / 이어받기 {st['resumed']}")
+            print(f"  {'✅' if same else '❌'} 원본과 동일, 파싱 완료 {cached}/{len(files)}\n")
+    return 0 if ok else 1
+
+
+def naive_top(table, regions, months, min_area, n):
+    """serve.QueryIndex.top 대조용: 전체 행을 훑어 단지별 최고 거래 → 정렬"""
+    region_vals = table.region_pool.values
+    best = {}
+    for i in range(len(table)):
+        if table.ym[i] not in months or table.area[i] < min_area:
+            continue
+        if regions is not None and region_vals[table.region[i]] not in regions:
+            continue
+        k = (table.region[i], table.apt[i])
+        if k not in best or table.ppy[i] > table.ppy[best[k]]:
+            best[k] = i
+    return sorted(best.values(), key=lambda i: (-table.ppy[i], i))[:n]
+
+
+async def http_get(reader, writer, path, etag=None):
+    """keep-alive 연결로 GET 한 번 → (status, ETag)"""
+    head = f"GET {path} HTTP/1.1\r\nHost: bench\r\n"
+    if etag:
+        head += f"If-None-Match: {etag}\r\n"
+    writer.write((head + "\r\n").encode('utf-8'))
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        k, _, v = line.decode('latin-1').partition(':')
+        headers[k.strip().lower()] = v.strip()
+    await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('etag')
+
+
+async def api_load(port, paths, clients, etags=None):
+    """clients 개 연결이 paths 를 나눠 요청 → (지연시간 리스트, status 별 건수, ETag)"""
+    latencies, statuses, seen = [], {}, {}
+
+    async def client(k):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        for path in paths[k::clients]:
+            t0 = time.perf_counter()
+            status, etag = await http_get(reader, writer, path, (etags or {}).get(path))
+            latencies.append(time.perf_counter() - t0)
+            statuses[status] = statuses.get(status, 0) + 1
+            seen[path] = etag
+        writer.close()
+
+    await asyncio.gather(*(client(k) for k in range(clients)))
+    return latencies, statuses, seen
+
+
+def bench_api(clients, rounds):
+    """
+    serve.py 조회 API: /top 결과를 전체 스캔과 대조하고,
+    동시 연결 clients 개로 캐시 없음 / LRU 적중 / If-None-Match(304) 지연시간 비교
+    """
+    import serve
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        table = fetch_all.load_all_csv(True, os.cpu_count() or 1)
+    t0 = time.perf_counter()
+    index = serve.QueryIndex(table)
+    print(f"📂 {len(table):,}건, 색인 {(time.perf_counter() - t0) * 1e3:.0f}ms\n")
+
+    seoul = sorted(fetch_all.SEOUL_CODES)
+    cases = [(None, 12, 59, 50), (None, 3, 135, 20), (set(seoul), 6, 84, 100),
+             ({'11680'}, 12, 84, 50), ({'11680', '11650', '11710'}, 1, 59, 10)]
+    ok = True
+    for regions, months, min_area, n in cases:
+        period = index.period(months)
+        same = index.top(sorted(regions or index.region_rows), period, min_area, n) == \
+            naive_top(table, regions, set(period), min_area, n)
+        ok &= same
+        label = 'all' if regions is None else ','.join(sorted(regions))[:23]
+        print(f"  top {label:<23} {months:>2}개월 {min_area:>3}㎡ n={n:<3} {'✅ 동일' if same else '❌ 불일치'}")
+
+    apts = sorted(index.apts, key=lambda a: -sum(map(len, index.apts[a].values())))[:40]
+    paths = [f"/top?n=50&months={m}" for m in (1, 3, 6, 12)]
+    paths += [f"/top?region={r}&n=20&min_area={a}&months={m}"
+              for r in seoul for a in (59, 84) for m in (3, 12)]
+    paths += [f"/apt/{quote(a)}/series?months=24" for a in apts]
+    paths += [f"/top?board={b}&n=20&months=12" for b in fetch_all.LEADERBOARDS]
+    api = serve.ApiServer(index, serve.data_version(table), cache_size=len(paths))
+
+    ready = threading.Event()
+    box = {}
+
+    def on_ready(port):
+        box['port'] = port
+        ready.set()
+
+    threading.Thread(target=lambda: asyncio.run(api.serve('127.0.0.1', 0, on_ready)),
+                     daemon=True).start()
+    ready.wait()
+
+    print(f"\n  요청 {len(paths)}종 x {rounds}회, 동시 연결 {clients}개")
+    etags = None
+    for label in ('캐시 없음', 'LRU 적중', 'If-None-Match'):
+        if label == '캐시 없음':
+            api.respond.cache_clear()
+            batch = paths
+        else:
+            batch = paths * rounds
+        t0 = time.perf_counter()
+        lat, statuses, seen = asyncio.run(api_load(box['port'], batch, clients,
+                                                   etags if label == 'If-None-Match' else None))
+        dt = time.perf_counter() - t0
+        etags = etags or seen
+        lat.sort()
+        q = lambda p: lat[min(len(lat) - 1, int(len(lat) * p))] * 1e3
+        print(f"  {label:<14} {len(lat) / dt:8,.0f} req/s  p50 {q(0.5):6.2f}ms  p99 {q(0.99):6.2f}ms"
+              f"  max {lat[-1] * 1e3:6.2f}ms  {statuses}")
+        expect = 304 if label == 'If-None-Match' else 200
+        ok &= statuses == {expect: len(batch)}
+    return 0 if ok else 1
+
+
+def main():
+    ap = argparse.ArgumentParser(description='fetch_all.py 벤치마크')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    st = sub.add_parser('stages', help='단계별 시간/처리량/메모리')
+    st.add_argument('--scales', default='1,10', help='데이터 배율 목록 (기본: 1,10)')
+    st.add_argument('--no-memory', action='store_true', help='tracemalloc 측정 생략')
+    st.add_argument('--save-baseline', action='store_true', help=f'결과를 {BASELINE_PATH} 로 저장')
+    st.add_argument('--tolerance', type=float, default=0.2, help='회귀 판정 허용 비율 (기본 0.2)')
+    st.add_argument('--min-delta', type=float, default=MIN_DELTA,
+                    help=f'회귀 판정 최소 증가 시간(초, 기본 {MIN_DELTA})')
+    w = sub.add_parser('workers', help='CSV 병렬 파싱 스케일링')
+    w.add_argument('--max', type=int, default=os.cpu_count() or 1)
+    sub.add_parser('table', help='dict 리스트 vs TxTable 메모리/시간')
+    sub.add_parser('address', help='parse_address 캐시 효과')
+    b = sub.add_parser('backends', help='집계 python vs numpy 백엔드 비교')
+    b.add_argument('--scale', type=int, default=1, help='데이터 배율 (기본: 1)')
+    f = sub.add_parser('fetch', help='로컬 대역 서버로 CSV 다운로드 순차 vs 동시 비교')
+    f.add_argument('--rate', type=float, default=4.0, help='파일당 전송 속도 MB/s (기본 4)')
+    f.add_argument('--faults', action='store_true', help='파일마다 503 / 전송 중 끊김 한 번씩 주입')
+    sub.add_parser('scanner', help='mmap 바이트 스캐너 vs csv 모듈 레코드 동일성/시간')
+    a = sub.add_parser('api', help='serve.py 조회 API 정확성 + 동시 요청 지연시간')
+    a.add_argument('--clients', type=int, default=32, help='동시 연결 수 (기본 32)')
+    a.add_argument('--rounds', type=int, default=10, help='캐시 적중 단계 반복 횟수 (기본 10)')
+    args = ap.parse_args()
+
+    if args.cmd == 'stages':
+        scales = [int(x) for x in args.scales.split(',')]
+        sys.exit(bench_all_stages(scales, not args.no_memory, args.save_baseline, args.tolerance,
+                                  args.min_delta))
+    elif args.cmd == 'workers':
+        bench_workers(args.max)
+    elif args.cmd == 'table':
+        bench_table()
+    elif args.cmd == 'address':
+        bench_address()
+    elif args.cmd == 'backends':
+        sys.exit(bench_backends(args.scale))
+    elif args.cmd == 'scanner':
+        sys.exit(bench_scanner())
+    elif args.cmd == 'fetch':
+        sys.exit(bench_fetch(args.rate, args.faults))
+    elif args.cmd == 'api':
+        sys.exit(bench_api(args.clients, args.rounds))
+
+
+if __name__ == '__main__':
+    main()
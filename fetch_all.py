@@ -2,25 +2,98 @@
 전국 아파트 대시보드 통합 데이터 처리기 (CSV 버전)
 ─────────────────────────────────────
 CSV 파일에서 데이터를 읽어 두 가지 대시보드 데이터를 생성:
-  1) 전국 구별 TOP 10  → data/district_top10.json  (index.html 에서 사용)
-  2) 서울 아파트 TOP 20 → seoul.html               (인라인 데이터)
-
-- 데이터 소스: 국토교통부 실거래가 공개시스템 CSV 다운로드
+  1) 전국 구별 TOP 10  → data/districts/          (index.html 에서 구별로 로드)
+                          data/district_top10.json (전체 통합본)
+  2) 지역 묶음별 TOP N  → seoul.html, busan.html ... (LEADERBOARDS, templates/leaderboard.html
+                                                     + 데이터 JSON, 스타일/스크립트는 assets/)
+생성 파일마다 .gz (brotli 설치 시 .br) 압축본과 data/manifest.json (내용 해시) 를 함께 기록
+월별 집계는 data/monthly.sqlite 에 누적 → CSV 에서 빠진 과거 달도 추이 차트에 유지
+         (최근 36개월까지, --history-months 로 조정)
+--ingest 로 전체 거래를 SQLite 창고에 적재하면 query.py 로 임의 조회 가능
+         (다음 --ingest 는 중복 인덱스로 새 CSV 의 새 거래만 덧붙임)
+--fetch SOURCES 로 CSV 를 동시에 내려받아 data/csv/ 에 저장 (끝난 파일부터 바로 파싱)
+--since / --only / --exclude-cancelled 는 주소 파싱 전에 원본 필드로 거름 (RowFilter)
+--watch 는 상주하며 data/csv/ 에 새로 들어온 CSV 의 거래만 집계에 더해 산출물 갱신
+
+- 데이터 소스: 국토교통부 실거래가 공개시스템 CSV 다운로드 (직접 또는 --fetch)
 - 필터: 전용면적 59㎡ 이상
 - 기간: TOP 산정 최근 6개월 / 추이 차트 최근 3년
 """
 
+import argparse
+import asyncio
+import codecs
 import csv
 import glob
+import gzip
+import hashlib
+import heapq
+import http.client
+import io
+import mmap
+import pickle
+import random
+import sqlite3
+import sys
+import time
+import tracemalloc
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager, contextmanager, redirect_stdout
 from datetime import datetime, timedelta
+from functools import lru_cache, partial
 from collections import defaultdict
+from urllib.parse import unquote, urlencode, urlsplit
 import os, json, re
 
+try:
+    import brotli  # 선택: 설치돼 있으면 .br 도 생성
+except ImportError:
+    brotli = None
+
+try:
+    import numpy as np  # 선택: 설치돼 있으면 feed_table 을 벡터 연산으로 집계
+except ImportError:
+    np = None
+
 # ── 설정 ──
 GOOGLE_MAPS_API_KEY = os.environ.get('GOOGLE_MAPS_API_KEY', '')
 DATA_DIR = 'data'
+TEMPLATE_DIR = 'templates'
+ASSET_DIR = 'assets'
 CSV_DIR = os.path.join(DATA_DIR, 'csv')
+CACHE_DIR = os.path.join(DATA_DIR, 'cache')
+CSV_CACHE_PATH = os.path.join(CACHE_DIR, 'csv_records.pkl')
+DEDUP_INDEX_PATH = os.path.join(CACHE_DIR, 'dedup.idx')
+AGG_STORE_PATH = os.path.join(DATA_DIR, 'monthly.sqlite')
+WAREHOUSE_PATH = os.path.join(CACHE_DIR, 'warehouse.sqlite')  # --ingest 로 생성, query.py 로 조회
+HISTORY_MONTHS = 36  # 추이 차트에 합칠 저장소 이력 (최근 N 개월, 문서의 추이 차트 3년)
+CACHE_VERSION = 1
 MIN_AREA = 59
+SNIFF_BYTES = 64 * 1024  # 인코딩 판별에 쓰는 앞부분 크기
+
+# 인코딩 통계 (대체 코덱으로 디코딩한 줄이 있었던 파일 수 등)
+ENCODING_STATS = {'files': 0, 'fallback_files': 0, 'fallback_lines': 0}
+
+# 마지막 CSV 로드 통계 (iter_csv_batches / iter_transactions 가 갱신)
+LOAD_STATS = {}
+
+# 이번 실행에서 생성한 정적 산출물 경로 (write_artifact 가 기록, 압축/매니페스트 대상)
+ARTIFACTS = []
+ARTIFACT_HASH_LEN = 12
+# 출력별 의미 해시 (생성 시각 제외) — 같으면 다시 생성하지 않음
+PAYLOAD_HASHES = {}
+
+RUN_METRICS_PATH = os.path.join(DATA_DIR, 'run_metrics.json')
+RUN_METRICS_KEEP = 200  # run_metrics.json 에 보관할 최근 실행 수
+
+# 거래 레코드 필드 순서 (캐시 직렬화 / JSON 출력 순서와 동일)
+RECORD_FIELDS = (
+    'apt_name', 'sido', 'sigungu', 'dong', 'area_m2', 'area_pyeong',
+    'price', 'price_per_pyeong', 'deal_year', 'deal_month', 'deal_day',
+    'floor', 'build_year', 'region_code',
+)
 
 # ── 시도 이름 매핑 (CSV 풀네임 → REGIONS 약칭) ──
 SIDO_MAP = {
@@ -186,6 +259,22 @@ REGIONS = {
 
 # 서울 지역코드 (서울 TOP 20용)
 SEOUL_CODES = {k for k, v in REGIONS.items() if v[0] == '서울시'}
+BUSAN_CODES = {k for k, v in REGIONS.items() if v[0] == '부산시'}
+GYEONGGI_CODES = {k for k, v in REGIONS.items() if v[0] == '경기도'}
+GANGNAM3_CODES = {'11680', '11650', '11710'}  # 강남구, 서초구, 송파구
+
+# 구별 TOP N
+DISTRICT_TOP_N = 10
+
+# 지역 묶음별 순위표: 이름 → (제목, 지역코드 집합, N)
+# 집계 순회 중 함께 유지되므로 순위표를 늘려도 추가 비용은 해당 지역 거래의 순위표 갱신뿐
+# 출력: <이름>.html + data/leaderboards/<이름>_*.json (서울은 기존 경로 유지, board_paths 참고)
+LEADERBOARDS = {
+    'seoul': ('서울', SEOUL_CODES, 20),
+    'busan': ('부산', BUSAN_CODES, 20),
+    'gyeonggi': ('경기', GYEONGGI_CODES, 20),
+    'gangnam3': ('강남 3구', GANGNAM3_CODES, 20),
+}
 
 
 # ════════════════════════════════════════
@@ -202,6 +291,79 @@ def build_reverse_map():
 REVERSE_REGION = build_reverse_map()
 
 
+class AddressResolver:
+    """
+    CSV '시군구' 컬럼 → (sido_short, sigungu, dong, region_code)
+
+    REGIONS / SIDO_MAP 으로 만든 토큰 트라이를 한 번 훑어 가장 긴
+    시군구 매치를 찾고, 원문 문자열 단위 LRU 캐시로 반복 주소를 바로 반환한다.
+    stats() 의 적중에는 스캐너의 파일별 DecodeCache 가 LRU 앞에서 처리한 조회도
+    포함된다 (미스 = 실제 트라이 파싱 횟수).
+    """
+
+    def __init__(self, maxsize=16384):
+        self.trie = self._build_trie()
+        self.resolve = lru_cache(maxsize=maxsize)(self._resolve)
+        self._merged = {'hits': 0, 'misses': 0}  # LRU 밖에서 센 적중 + 워커 프로세스 합산
+
+    @staticmethod
+    def _build_trie():
+        """{sido_short: {토큰: {토큰: ..., None: region_code}}}"""
+        trie = {}
+        for code, (sido, sigungu) in REGIONS.items():
+            node = trie.setdefault(sido, {})
+            for tok in sigungu.split():
+                node = node.setdefault(tok, {})
+            node[None] = code
+        return trie
+
+    def _resolve(self, addr_str):
+        parts = addr_str.split()
+        if len(parts) < 2:
+            return None, None, None, None
+
+        sido_full = parts[0]
+        sido_short = SIDO_MAP.get(sido_full, sido_full)
+        rest = parts[1:]
+
+        # 가장 긴 매치 (예: "고양시 덕양구" → 2단어 매치), 최대 3단어
+        node = self.trie.get(sido_short)
+        code, n = None, 0
+        if node is not None:
+            for k, tok in enumerate(rest[:3], 1):
+                node = node.get(tok)
+                if node is None:
+                    break
+                if None in node:
+                    code, n = node[None], k
+        if code is not None:
+            return sido_short, REGIONS[code][1], ' '.join(rest[n:]), code
+
+        # 세종시 특수 처리: 시군구 없이 바로 동 이름
+        if sido_short == '세종시':
+            dong = ' '.join(rest)
+            return '세종시', '세종시', dong, REVERSE_REGION.get(('세종시', '세종시'))
+
+        return sido_short, ' '.join(rest[:1]), ' '.join(rest[1:]), None
+
+    def merge_stats(self, delta):
+        """워커 프로세스에서 집계된 적중/미스 수, 또는 DecodeCache 적중 수 합산"""
+        for k in self._merged:
+            self._merged[k] += delta.get(k, 0)
+
+    def stats(self):
+        ci = self.resolve.cache_info()
+        return {
+            'hits': ci.hits + self._merged['hits'],
+            'misses': ci.misses + self._merged['misses'],
+            'size': ci.currsize,
+            'maxsize': ci.maxsize,
+        }
+
+
+ADDRESS_RESOLVER = AddressResolver()
+
+
 def parse_address(addr_str):
     """
     CSV '시군구' 컬럼을 파싱하여 (sido_short, sigungu, dong, region_code) 반환
@@ -212,144 +374,1200 @@ def parse_address(addr_str):
       "경기도 용인시 처인구 이동읍 천리"  → (경기도, 용인시 처인구, 이동읍, 41461)
       "세종특별자치시 종촌동"            → (세종시, 세종시, 종촌동, 36110)
     """
-    parts = addr_str.strip().split()
-    if len(parts) < 2:
-        return None, None, None, None
+    return ADDRESS_RESOLVER.resolve(addr_str)
 
-    sido_full = parts[0]
-    sido_short = SIDO_MAP.get(sido_full, sido_full)
-    rest = parts[1:]
 
-    # 가장 긴 매치부터 시도 (예: "고양시 덕양구" → 2단어 매치)
-    for n in range(min(len(rest), 3), 0, -1):
-        candidate = ' '.join(rest[:n])
-        key = (sido_short, candidate)
-        if key in REVERSE_REGION:
-            dong = ' '.join(rest[n:]) if n < len(rest) else ''
-            return sido_short, candidate, dong, REVERSE_REGION[key]
+def sniff_encoding(head):
+    """
+    파일 앞부분 바이트로 인코딩 1회 결정
+    - UTF-8 BOM → utf-8-sig
+    - 비 ASCII 가 있고 UTF-8 로 디코딩 가능 → utf-8
+    - 그 외 → cp949 (euc-kr 의 상위 집합, 국토부 CSV 기본값)
+    """
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if head.isascii():
+        return 'cp949'
+    try:
+        head.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # 버퍼 끝에서 잘린 멀티바이트 문자는 무시
+        if e.reason != 'unexpected end of data':
+            return 'cp949'
+    return 'utf-8'
+
+
+def decode_csv_text(data, enc, stats):
+    """
+    바이트 → 문자열. 전체 디코딩이 실패하면 같은 버퍼를 줄 단위로
+    디코딩하며 실패한 줄만 대체 코덱으로 처리 (파일을 다시 읽지 않음)
+    """
+    try:
+        return data.decode(enc)
+    except UnicodeDecodeError:
+        pass
+    alt = 'cp949' if enc.startswith('utf-8') else 'utf-8'
+    lines = []
+    bad = 0
+    for raw in data.splitlines(keepends=True):
+        try:
+            lines.append(raw.decode(enc))
+        except UnicodeDecodeError:
+            bad += 1
+            try:
+                lines.append(raw.decode(alt))
+            except UnicodeDecodeError:
+                lines.append(raw.decode(enc, errors='replace'))
+    stats['fallback_files'] += 1
+    stats['fallback_lines'] += bad
+    return ''.join(lines)
 
-    # 세종시 특수 처리: 시군구 없이 바로 동 이름
-    if sido_short == '세종시':
-        dong = ' '.join(rest)
-        return '세종시', '세종시', dong, REVERSE_REGION.get(('세종시', '세종시'))
 
-    return sido_short, ' '.join(rest[:1]), ' '.join(rest[1:]), None
+class RowFilter:
+    """
+    CSV 행 조건 + 컬럼 선택 (iter_csv_rows 에서 주소 파싱 / 튜플 생성 전에 적용)
+
+      ym_min / ym_max   : 계약년월 범위 (YYYYMM 정수, 양끝 포함, None = 제한 없음)
+      regions           : 지역코드 집합 (None = 전체)
+      min_area          : 전용면적 하한 (MIN_AREA 보다 낮추지는 못함)
+      exclude_cancelled : 해제사유발생일이 있는 (계약 해제된) 거래 제외
+      columns           : 채울 RECORD_FIELDS 이름 (None = 전체, 나머지는 빈 값)
+                          중복 판정 / 집계에 쓰는 REQUIRED 필드는 항상 채운다
+
+    계약년월 / 면적 / 해제 여부는 원본 필드 문자열로, 지역은 '시군구' 첫 토큰(시도)으로
+    먼저 거른 뒤 통과한 행만 주소를 파싱한다.
+    exclude_cancelled 가 아니면 캐시된 레코드에도 keep() 으로 같은 조건을 적용할 수 있다.
+    """
 
+    # dedup_key() + MonthlyAggregate 가 읽는 필드
+    REQUIRED = ('apt_name', 'region_code', 'area_m2', 'price', 'price_per_pyeong',
+                'deal_year', 'deal_month', 'deal_day', 'floor')
+
+    def __init__(self, ym_min=None, ym_max=None, regions=None, min_area=MIN_AREA,
+                 exclude_cancelled=False, columns=None):
+        self.ym_min = ym_min
+        self.ym_max = ym_max
+        self.regions = frozenset(regions) if regions is not None else None
+        self.min_area = max(min_area, MIN_AREA)
+        self.exclude_cancelled = exclude_cancelled
+        self.columns = tuple(columns) if columns is not None else None
+        # 원본 문자열 비교용 (계약년월은 항상 6자리 숫자)
+        self.ym_lo = str(ym_min) if ym_min else ''
+        self.ym_hi = str(ym_max) if ym_max else '999999'
+        self.sidos = None
+        if self.regions is not None:
+            short = {REGIONS[r][0] for r in self.regions if r in REGIONS}
+            self.sidos = frozenset(short | {full for full, s in SIDO_MAP.items() if s in short})
+        self.blank = None
+        if self.columns is not None:
+            keep = set(self.columns) | set(self.REQUIRED)
+            blank = tuple(f not in keep for f in RECORD_FIELDS)
+            self.blank = blank if any(blank) else None
+
+    def __repr__(self):
+        parts = [f'{k}={v!r}' for k, v in (
+            ('ym_min', self.ym_min), ('ym_max', self.ym_max),
+            ('regions', len(self.regions) if self.regions is not None else None),
+            ('min_area', self.min_area if self.min_area != MIN_AREA else None),
+            ('exclude_cancelled', self.exclude_cancelled or None),
+            ('columns', self.columns)) if v is not None]
+        return f"RowFilter({', '.join(parts)})"
+
+    @property
+    def cacheable(self):
+        """캐시된 레코드에 keep() 으로 적용 가능한지 (해제 여부는 레코드에 없음)"""
+        return not self.exclude_cancelled
+
+    def keep(self, row):
+        """레코드 튜플이 조건을 만족하는지 (캐시 적중 파일용)"""
+        if self.regions is not None and row[13] not in self.regions:
+            return False
+        if row[4] < self.min_area:
+            return False
+        ym = row[8] + row[9]
+        return self.ym_lo <= ym <= self.ym_hi
+
+    def project(self, row):
+        """columns 밖의 필드를 빈 값으로 (문자열 '' / 숫자 0)"""
+        if self.blank is None:
+            return row
+        return tuple((0 if type(v) is not str else '') if b else v
+                     for v, b in zip(row, self.blank))
+
+
+def row_conditions(spec):
+    """RowFilter → csv_record / scan_csv_rows 가 쓰는 조건 튜플"""
+    if spec is None:
+        return MIN_AREA, None, None, None, None, False
+    ym_lo = ym_hi = None
+    if spec.ym_min or spec.ym_max:
+        ym_lo, ym_hi = spec.ym_lo, spec.ym_hi
+    return spec.min_area, ym_lo, ym_hi, spec.sidos, spec.regions, spec.exclude_cancelled
+
+
+def csv_record(row, conds):
+    """
+    csv 모듈로 나눈 한 행 (문자열 리스트) → 거래 레코드 튜플 (조건 불만족 / 형식 오류면 None)
+    conds: row_conditions() 결과
+    """
+    min_area, ym_lo, ym_hi, sidos, regions, cancelled = conds
+    if len(row) < 15:
+        return None
+
+    # 원본 문자열로 먼저 거르기 (계약년월 → 시도 → 해제 여부)
+    if ym_lo is not None and not ym_lo <= row[7].strip() <= ym_hi:
+        return None
+    if sidos is not None and row[1].lstrip().partition(' ')[0] not in sidos:
+        return None
+    if cancelled and len(row) > 16 and row[16].strip() not in ('', '-'):
+        return None
+
+    # 전용면적 필터
+    try:
+        area = float(row[6].strip())
+    except:
+        return None
+    if area < min_area:
+        return None
+
+    # 거래금액
+    price_str = row[9].replace(',', '').strip()
+    try:
+        price = int(price_str)
+    except:
+        return None
+
+    # 주소 파싱
+    sido, sigungu, dong, region_code = parse_address(row[1])
+    if not region_code:
+        return None
+    if regions is not None and region_code not in regions:
+        return None
+
+    # 계약년월 (202602 → year=2026, month=02)
+    ym = row[7].strip()
+    deal_year = ym[:4] if len(ym) >= 6 else ''
+    deal_month = ym[4:6] if len(ym) >= 6 else ''
+    deal_day = row[8].strip()
+
+    # 층 (- 인 경우 빈 문자열)
+    floor_val = row[11].strip()
+    if floor_val == '-':
+        floor_val = ''
+
+    # 건축년도
+    build_year = row[14].strip() if len(row) > 14 else ''
+
+    return (
+        row[5].strip(), sido, sigungu, dong,
+        area, round(area / 3.3, 1),
+        price, round((price / area) * 3.3),
+        deal_year, deal_month, deal_day,
+        floor_val, build_year, region_code,
+    )
+
+
+def iter_csv_rows_text(filepath, stats=ENCODING_STATS, spec=None):
+    """
+    참조 구현: 파일 전체를 문자열로 디코딩한 뒤 csv 모듈로 분할
+    (scan_csv_rows 가 처리하지 않는 파일의 대체 경로, bench.py scanner 의 비교 기준)
+    """
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    enc = sniff_encoding(data[:SNIFF_BYTES])
+    stats['files'] += 1
+    text = decode_csv_text(data, enc, stats)
+    del data
+
+    conds = row_conditions(spec)
+    reader = csv.reader(io.StringIO(text, newline=''))
+    header_found = False
+    for row in reader:
+        # 헤더 행 찾기 (첫 번째 셀이 "NO"인 행)
+        if not header_found:
+            if len(row) > 0 and row[0].strip('"') == 'NO':
+                header_found = True
+            continue
+        rec = csv_record(row, conds)
+        if rec is not None:
+            yield rec if spec is None else spec.project(rec)
 
-def load_csv_file(filepath):
-    """단일 CSV 파일 로드 → 거래 데이터 리스트 반환"""
-    items = []
-    encodings = ['euc-kr', 'cp949', 'utf-8-sig', 'utf-8']
 
-    for enc in encodings:
+class DecodeCache(dict):
+    """키를 처음 조회할 때만 fn(키) 를 계산해 보관하는 dict"""
+
+    def __init__(self, fn):
+        super().__init__()
+        self.fn = fn
+
+    def __missing__(self, key):
+        value = self[key] = self.fn(key)
+        return value
+
+
+def _scan_address(addr):
+    """시군구 문자열 → (시도 토큰, parse_address 결과)"""
+    return addr.lstrip().partition(' ')[0], parse_address(addr)
+
+
+def scan_csv_rows(filepath, stats=ENCODING_STATS, spec=None):
+    """
+    mmap 한 파일을 바이트 단위로 분할하는 CSV 스캐너 (iter_csv_rows_text 와 같은 레코드)
+
+    국토부 CSV 는 모든 필드가 "..." 로 감싸져 있으므로 한 줄을 b'","' 로 자르고,
+    면적 / 금액은 바이트에서 바로 숫자로 바꾼다. 문자열은 쓰는 컬럼만 디코딩하며
+    같은 바이트열(시군구, 단지명, 계약년월 …)은 파일 안에서 한 번만 디코딩 / 주소 파싱한다.
+    따옴표가 섞인 필드, 여러 줄 필드, 디코딩 실패 줄은 그 줄만 csv 모듈 경로(csv_record)로 처리.
+    NUL 바이트나 단독 CR 줄바꿈이 있으면 파일 전체를 iter_csv_rows_text 로 넘긴다.
+
+    차이: 인코딩 대체 디코딩은 쓰는 컬럼에서 실패한 줄만 센다 (참조 구현은 줄 전체 기준).
+    """
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            stats['files'] += 1
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b'\x00') != -1 or re.search(rb'\r(?!\n)', mm):
+                yield from iter_csv_rows_text(filepath, stats, spec)
+                return
+            yield from _scan_lines(mm, stats, spec)
+
+
+def _scan_lines(mm, stats, spec):
+    enc = sniff_encoding(mm[:SNIFF_BYTES])
+    stats['files'] += 1
+    fenc = 'utf-8' if enc == 'utf-8-sig' else enc
+    alt = 'cp949' if enc.startswith('utf-8') else 'utf-8'
+    conds = row_conditions(spec)
+    min_area, ym_lo, ym_hi, sidos, regions, cancelled = conds
+    project = spec.project if spec is not None and spec.blank is not None else None
+    bad = 0
+
+    lines = iter(mm.readline, b'')
+    lookups = 0  # 주소 조회 수 (DecodeCache 적중 = lookups - len(addrs))
+
+    def decode_line(raw):
+        # decode_csv_text 의 줄 단위 대체 디코딩과 같은 규칙
+        nonlocal bad
         try:
-            with open(filepath, 'r', encoding=enc) as f:
-                reader = csv.reader(f)
-                header_found = False
-                for row in reader:
-                    # 헤더 행 찾기 (첫 번째 셀이 "NO"인 행)
-                    if not header_found:
-                        if len(row) > 0 and row[0].strip('"') == 'NO':
-                            header_found = True
-                        continue
-
-                    if len(row) < 15:
-                        continue
-
-                    # 전용면적 필터
-                    try:
-                        area = float(row[6].strip())
-                    except:
-                        continue
-                    if area < MIN_AREA:
-                        continue
-
-                    # 거래금액
-                    price_str = row[9].replace(',', '').strip()
-                    try:
-                        price = int(price_str)
-                    except:
-                        continue
-
-                    # 주소 파싱
-                    sido, sigungu, dong, region_code = parse_address(row[1])
-                    if not region_code:
-                        continue
-
-                    # 계약년월 (202602 → year=2026, month=02)
-                    ym = row[7].strip()
-                    deal_year = ym[:4] if len(ym) >= 6 else ''
-                    deal_month = ym[4:6] if len(ym) >= 6 else ''
-                    deal_day = row[8].strip()
-
-                    # 층 (- 인 경우 빈 문자열)
-                    floor_val = row[11].strip()
-                    if floor_val == '-':
-                        floor_val = ''
-
-                    # 건축년도
-                    build_year = row[14].strip() if len(row) > 14 else ''
-
-                    items.append({
-                        'apt_name': row[5].strip(),
-                        'sido': sido,
-                        'sigungu': sigungu,
-                        'dong': dong,
-                        'area_m2': area,
-                        'area_pyeong': round(area / 3.3, 1),
-                        'price': price,
-                        'price_per_pyeong': round((price / area) * 3.3),
-                        'deal_year': deal_year,
-                        'deal_month': deal_month,
-                        'deal_day': deal_day,
-                        'floor': floor_val,
-                        'build_year': build_year,
-                        'region_code': region_code
-                    })
-            break  # 인코딩 성공
+            return raw.decode(fenc)
         except UnicodeDecodeError:
+            bad += 1
+            try:
+                return raw.decode(alt)
+            except UnicodeDecodeError:
+                return raw.decode(fenc, errors='replace')
+
+    def slow_row(first):
+        # csv 모듈이 필요한 만큼만 다음 줄을 당겨 감 (여러 줄 필드)
+        def decoded():
+            yield decode_line(first)
+            for raw in lines:
+                yield decode_line(raw)
+        return next(csv.reader(decoded()), [])
+
+    # 바이트 → 디코딩 결과 (처음 보는 값만 디코딩, 이후는 dict 조회)
+    text = DecodeCache(lambda b: b.decode(fenc).strip())
+    addrs = DecodeCache(lambda b: _scan_address(b.decode(fenc)))
+    yms = DecodeCache(lambda ym: (ym[:4], ym[4:6]) if len(ym) >= 6 else ('', ''))
+
+    def scan_record(fields):
+        # csv_record 와 같은 규칙 (디코딩 실패는 UnicodeDecodeError 로 호출 측에 알림)
+        nonlocal lookups
+        if ym_lo is not None and not ym_lo <= text[fields[7]] <= ym_hi:
+            return None
+        lookups += 1
+        addr = addrs[fields[1]]
+        if sidos is not None and addr[0] not in sidos:
+            return None
+        if cancelled and len(fields) > 16 and text[fields[16]] not in ('', '-'):
+            return None
+
+        # 숫자는 바이트에서 바로 (ASCII 숫자가 아니면 디코딩한 문자열로 한 번 더)
+        try:
+            area = float(fields[6])
+        except ValueError:
+            s = text[fields[6]]
+            try:
+                area = float(s)
+            except ValueError:
+                return None
+        if area < min_area:
+            return None
+        try:
+            price = int(fields[9].replace(b',', b''))
+        except ValueError:
+            s = fields[9].decode(fenc).replace(',', '').strip()
+            try:
+                price = int(s)
+            except ValueError:
+                return None
+
+        sido, sigungu, dong, region_code = addr[1]
+        if not region_code:
+            return None
+        if regions is not None and region_code not in regions:
+            return None
+
+        deal_year, deal_month = yms[text[fields[7]]]
+        floor_val = text[fields[11]]
+        if floor_val == '-':
+            floor_val = ''
+
+        return (
+            text[fields[5]], sido, sigungu, dong,
+            area, round(area / 3.3, 1),
+            price, round((price / area) * 3.3),
+            deal_year, deal_month, text[fields[8]],
+            floor_val, text[fields[14]], region_code,
+        )
+
+    # 헤더 ("NO" 로 시작하는 행) 까지는 csv 모듈로
+    first = True
+    for line in lines:
+        if first and enc == 'utf-8-sig' and line.startswith(codecs.BOM_UTF8):
+            line = line[len(codecs.BOM_UTF8):]
+        first = False
+        row = slow_row(line)
+        if len(row) > 0 and row[0].strip('"') == 'NO':
+            break
+
+    for line in lines:
+        body = line.rstrip(b'\r\n')
+        if not body:
+            continue
+        fields = None
+        if len(body) > 1 and body[0] == 34 and body[-1] == 34:
+            fields = body[1:-1].split(b'","')
+            if body.count(b'"') != 2 * len(fields):
+                fields = None  # 필드 안에 따옴표 ("") 가 있음
+        if fields is None:
+            rec = csv_record(slow_row(line), conds)
+        elif len(fields) < 15:
             continue
+        else:
+            try:
+                rec = scan_record(fields)
+            except UnicodeDecodeError:
+                rec = csv_record(next(csv.reader([decode_line(line)]), []), conds)
+        if rec is not None:
+            yield rec if project is None else project(rec)
+
+    if bad:
+        stats['fallback_files'] += 1
+        stats['fallback_lines'] += bad
+    ADDRESS_RESOLVER.merge_stats({'hits': lookups - len(addrs)})
+
+
+def iter_csv_rows(filepath, stats=ENCODING_STATS, spec=None):
+    """단일 CSV 파일 → 거래 레코드 튜플 (RECORD_FIELDS 순서) 스트림 (scan_csv_rows)"""
+    return scan_csv_rows(filepath, stats, spec)
+
+
+def read_csv_rows(filepath, stats=ENCODING_STATS, spec=None):
+    """iter_csv_rows() 결과 리스트 (읽기 실패 시 빈 리스트)"""
+    try:
+        return list(iter_csv_rows(filepath, stats, spec))
+    except Exception as e:
+        print(f"  ❌ 파일 읽기 실패 [{filepath}]: {e}")
+        return []
+
+
+def load_csv_file(filepath, stats=ENCODING_STATS):
+    """단일 CSV 파일 로드 → 거래 데이터 리스트 반환"""
+    return [dict(zip(RECORD_FIELDS, row)) for row in read_csv_rows(filepath, stats)]
+
+
+# ════════════════════════════════════════
+# 컬럼형 거래 테이블
+# ════════════════════════════════════════
+
+class StringPool:
+    """문자열 사전 인코딩 (값 ↔ 정수 코드)"""
+
+    __slots__ = ('values', 'index')
+
+    def __init__(self):
+        self.values = []
+        self.index = {}
+
+    def code(self, s):
+        c = self.index.get(s)
+        if c is None:
+            c = len(self.values)
+            s = sys.intern(s)
+            self.index[s] = c
+            self.values.append(s)
+        return c
+
+    def __len__(self):
+        return len(self.values)
+
+
+def ym_code(year, month):
+    """('2026', '02') → 202602 (비어 있으면 0)"""
+    try:
+        return int(year) * 100 + int(month)
+    except ValueError:
+        return 0
+
+
+def ym_shift(code, months):
+    """202602, -3 → 202511"""
+    n = (code // 100) * 12 + code % 100 - 1 + months
+    return (n // 12) * 100 + n % 12 + 1
+
+
+def ym_label(code):
+    """202602 → '2026.02'"""
+    return f"{code // 100}.{code % 100:02d}" if code else '.00'
+
+
+class TxTable:
+    """
+    거래 데이터 컬럼 저장소
+
+    문자열 컬럼(단지명/시도/시군구/동/지역코드/계약일/층/건축년도)은
+    StringPool 코드 배열, 수치 컬럼은 array 로 보관한다.
+    계약년월은 정수 코드(YYYYMM) 하나로 저장한다.
+    """
+
+    STR_COLUMNS = ('apt', 'sido', 'sigungu', 'dong', 'region', 'day', 'floor', 'build_year')
+
+    def __init__(self):
+        for name in self.STR_COLUMNS:
+            setattr(self, name, array('I'))
+            setattr(self, name + '_pool', StringPool())
+        self.area = array('d')
+        self.price = array('q')
+        self.ppy = array('q')
+        self.ym = array('I')
+
+    def __len__(self):
+        return len(self.ym)
+
+    def append(self, row):
+        """RECORD_FIELDS 순서의 튜플 1건 추가"""
+        (apt_name, sido, sigungu, dong, area_m2, _area_pyeong, price, ppy,
+         deal_year, deal_month, deal_day, floor_val, build_year, region_code) = row
+        self.apt.append(self.apt_pool.code(apt_name))
+        self.sido.append(self.sido_pool.code(sido))
+        self.sigungu.append(self.sigungu_pool.code(sigungu))
+        self.dong.append(self.dong_pool.code(dong))
+        self.region.append(self.region_pool.code(region_code))
+        self.day.append(self.day_pool.code(deal_day))
+        self.floor.append(self.floor_pool.code(floor_val))
+        self.build_year.append(self.build_year_pool.code(build_year))
+        self.area.append(area_m2)
+        self.price.append(price)
+        self.ppy.append(ppy)
+        self.ym.append(ym_code(deal_year, deal_month))
+
+    def record(self, i):
+        """i 번째 거래를 기존 dict 형태로 복원"""
+        ym = self.ym[i]
+        area = self.area[i]
+        return {
+            'apt_name': self.apt_pool.values[self.apt[i]],
+            'sido': self.sido_pool.values[self.sido[i]],
+            'sigungu': self.sigungu_pool.values[self.sigungu[i]],
+            'dong': self.dong_pool.values[self.dong[i]],
+            'area_m2': area,
+            'area_pyeong': round(area / 3.3, 1),
+            'price': self.price[i],
+            'price_per_pyeong': self.ppy[i],
+            'deal_year': str(ym // 100) if ym else '',
+            'deal_month': f"{ym % 100:02d}" if ym else '',
+            'deal_day': self.day_pool.values[self.day[i]],
+            'floor': self.floor_pool.values[self.floor[i]],
+            'build_year': self.build_year_pool.values[self.build_year[i]],
+            'region_code': self.region_pool.values[self.region[i]],
+        }
+
+    def rows(self):
+        """전체 거래를 RECORD_FIELDS 순서 튜플로 순회"""
+        for i in range(len(self)):
+            yield tuple(self.record(i).values())
+
+    def region_codes(self, codes):
+        """지역코드 문자열 집합 → 이 테이블의 region 코드 집합"""
+        idx = self.region_pool.index
+        return {idx[c] for c in codes if c in idx}
+
+    def select(self, months=None, regions=None, rows=None):
+        """
+        조건에 맞는 행 번호 배열
+          months : 계약년월 코드(YYYYMM) 집합
+          regions: region 컬럼 코드 집합 (region_codes() 결과)
+          rows   : 이 안에서만 선택 (기본: 전체)
+        """
+        ym, region = self.ym, self.region
+        it = range(len(self)) if rows is None else rows
+        out = array('I')
+        for i in it:
+            if months is not None and ym[i] not in months:
+                continue
+            if regions is not None and region[i] not in regions:
+                continue
+            out.append(i)
+        return out
+
+
+# ════════════════════════════════════════
+# 중복 제거 인덱스
+# ════════════════════════════════════════
+
+def dedup_key(row):
+    """중복 판정 키 (단지명, 지역코드, 면적, 년, 월, 일, 금액, 층) → bytes"""
+    return '\x1f'.join((
+        row[0], row[13], repr(row[4]), row[8], row[9], row[10], str(row[6]), row[11]
+    )).encode('utf-8')
+
+
+def key_hash64(key):
+    h = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little')
+    return h or 1  # 0 은 빈 슬롯 표시
+
+
+class DedupIndex:
+    """
+    거래 중복 제거용 64비트 해시 집합 (open addressing, array('Q'))
+
+    튜플 set 대비 항목당 ~16바이트. --ingest 는 창고에 든 거래의 인덱스를
+    save() 로 남기고 다음 적재 때 load() 해, 예전 CSV 를 다시 읽지 않고 새 CSV 의
+    새 거래만 덧붙인다 (ingest_warehouse 참고). files 는 반영한 CSV 의 크기/mtime/SHA-1.
+    verify=True 이면 원본 키도 보관해 해시 충돌을 정확히 판별한다.
+    """
+
+    MAGIC = b'DDIX2\n'
+
+    def __init__(self, capacity=1 << 16, verify=False):
+        cap = 1
+        while cap < capacity:
+            cap <<= 1
+        self.slots = array('Q', bytes(8 * cap))
+        self.mask = cap - 1
+        self.count = 0
+        self.verify = verify
+        self.exact = {} if verify else None  # 해시 → 원본 키 집합
+        self.collisions = 0
+        self.files = {}  # 반영한 CSV 경로 → {'size', 'mtime', 'sha1'}
+
+    def __len__(self):
+        return self.count
+
+    def _probe(self, h):
+        """h 가 있으면 (True, 위치), 없으면 (False, 빈 슬롯 위치)"""
+        slots, mask = self.slots, self.mask
+        i = h & mask
+        while True:
+            v = slots[i]
+            if v == h:
+                return True, i
+            if v == 0:
+                return False, i
+            i = (i + 1) & mask
+
+    def add(self, row):
+        """새 거래면 True (인덱스에 추가), 이미 있으면 False"""
+        key = dedup_key(row)
+        h = key_hash64(key)
+        found, i = self._probe(h)
+        if found:
+            if self.verify:
+                keys = self.exact[h]
+                if key in keys:
+                    return False
+                # 해시만 같은 다른 거래: 키를 기록하고 새 거래로 취급
+                keys.add(key)
+                self.collisions += 1
+                return True
+            return False
+        self.slots[i] = h
+        self.count += 1
+        if self.verify:
+            self.exact[h] = {key}
+        if self.count * 2 > len(self.slots):
+            self._grow()
+        return True
+
+    def __contains__(self, row):
+        key = dedup_key(row)
+        h = key_hash64(key)
+        if not self._probe(h)[0]:
+            return False
+        return not self.verify or key in self.exact[h]
+
+    def _grow(self):
+        old = self.slots
+        self.slots = array('Q', bytes(16 * len(old)))
+        self.mask = len(self.slots) - 1
+        slots, mask = self.slots, self.mask
+        for h in old:
+            if h:
+                i = h & mask
+                while slots[i]:
+                    i = (i + 1) & mask
+                slots[i] = h
+
+    def mark_file(self, filepath, sha1):
+        """filepath 의 거래를 반영했음을 기록 (sha1 은 CsvCache 가 이미 계산한 값)"""
+        st = os.stat(filepath)
+        self.files[filepath] = {'size': st.st_size, 'mtime': st.st_mtime_ns, 'sha1': sha1}
+
+    def covers(self, filepath):
+        """filepath 가 반영할 때와 같은 내용인지 (크기 + mtime, mtime 만 다르면 SHA-1)"""
+        ent = self.files.get(filepath)
+        if ent is None:
+            return False
+        st = os.stat(filepath)
+        if ent['size'] != st.st_size:
+            return False
+        return ent['mtime'] == st.st_mtime_ns or ent['sha1'] == file_sha1(filepath)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        header = {'count': self.count, 'capacity': len(self.slots), 'files': self.files}
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(self.MAGIC)
+            f.write(json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n')
+            self.slots.tofile(f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """저장된 인덱스 (verify 모드는 원본 키가 없으므로 해제 상태로 로드)"""
+        with open(path, 'rb') as f:
+            if f.readline() != cls.MAGIC:
+                raise ValueError(f"중복 인덱스 형식 아님: {path}")
+            header = json.loads(f.readline())
+            idx = cls(capacity=header['capacity'])
+            idx.slots = array('Q')
+            idx.slots.fromfile(f, header['capacity'])
+        idx.count = header['count']
+        idx.files = header['files']
+        return idx
+
+
+# ════════════════════════════════════════
+# CSV 파싱 캐시
+# ════════════════════════════════════════
+
+def file_sha1(filepath):
+    h = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def pack_records(rows):
+    """레코드 튜플 리스트 → 압축 바이너리 (필드 순서는 RECORD_FIELDS)"""
+    return zlib.compress(pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL), 1)
+
+
+def unpack_records(blob):
+    """pack_records() 역변환 → RECORD_FIELDS 순서 튜플 리스트"""
+    return pickle.loads(zlib.decompress(blob))
+
+
+class CsvCache:
+    """
+    파일별 파싱 결과 캐시 (data/cache/csv_records.pkl)
+
+    키: CSV 상대경로. 크기 + mtime 이 같으면 바로 적중,
+    mtime 만 다르면 (git checkout 등) SHA-1 로 내용 비교 후 재사용.
+    """
+
+    def __init__(self, path=CSV_CACHE_PATH, rebuild=False):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        if not rebuild:
+            self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                payload = pickle.load(f)
         except Exception as e:
-            print(f"  ❌ 파일 읽기 실패 [{filepath}]: {e}")
-            return []
+            print(f"  ⚠️ 캐시 읽기 실패, 전체 재파싱: {e}")
+            return
+        if (payload.get('version') != CACHE_VERSION
+                or payload.get('min_area') != MIN_AREA):
+            return
+        self.entries = payload.get('files', {})
+
+    def has(self, filepath):
+        """파일이 캐시와 일치하는지 확인 (적중/미스 집계 포함)"""
+        ent = self.entries.get(filepath)
+        st = os.stat(filepath)
+        if ent is None or ent['size'] != st.st_size:
+            self.misses += 1
+            return False
+        if ent['mtime'] != st.st_mtime_ns:
+            if ent['sha1'] != file_sha1(filepath):
+                self.misses += 1
+                return False
+            ent['mtime'] = st.st_mtime_ns
+            self.dirty = True
+        self.hits += 1
+        return True
+
+    def get(self, filepath):
+        """has() 로 확인된 파일의 레코드 튜플 리스트"""
+        return unpack_records(self.entries[filepath]['blob'])
+
+    def put(self, filepath, blob):
+        """pack_records() 결과를 그대로 저장"""
+        st = os.stat(filepath)
+        self.entries[filepath] = {
+            'size': st.st_size,
+            'mtime': st.st_mtime_ns,
+            'sha1': file_sha1(filepath),
+            'blob': blob,
+        }
+        self.dirty = True
+
+    def prune(self, live_paths):
+        """삭제된 CSV 의 캐시 항목 제거"""
+        live = set(live_paths)
+        for path in [p for p in self.entries if p not in live]:
+            del self.entries[path]
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump({
+                'version': CACHE_VERSION,
+                'min_area': MIN_AREA,
+                'files': self.entries,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+def parse_to_blob(filepath, spec=None):
+    """
+    단일 CSV 파싱 → (pack_records() 바이너리, 인코딩 통계, 주소 캐시 통계)
+    바이너리로 돌려주어 워커 ↔ 메인 간 전송량을 줄인다
+    """
+    stats = dict.fromkeys(ENCODING_STATS, 0)
+    before = ADDRESS_RESOLVER.stats()
+    blob = pack_records(read_csv_rows(filepath, stats, spec))
+    after = ADDRESS_RESOLVER.stats()
+    addr = {k: after[k] - before[k] for k in ('hits', 'misses')}
+    return blob, stats, addr
 
-    return items
 
+def iter_parsed(paths, workers=1, spec=None):
+    """
+    여러 CSV 를 파싱하여 입력 순서대로 바이너리를 하나씩 반환
+    workers > 1 이면 프로세스 풀로 병렬 파싱 (반환 순서는 동일)
+    """
+    def collect(result, remote):
+        blob, stats, addr = result
+        for k, v in stats.items():
+            ENCODING_STATS[k] += v
+        if remote:
+            ADDRESS_RESOLVER.merge_stats(addr)
+        return blob
 
-def load_all_csv():
-    """data/csv/ 디렉토리의 모든 CSV 파일을 읽어 통합 데이터 반환"""
-    csv_files = sorted(glob.glob(os.path.join(CSV_DIR, '*.csv')))
-    if not csv_files:
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as ex:
+            for result in ex.map(partial(parse_to_blob, spec=spec), paths):
+                yield collect(result, True)
+    else:
+        for p in paths:
+            yield collect(parse_to_blob(p, spec), False)
+
+
+def parse_csv_files(paths, workers=1):
+    """iter_parsed() 결과를 리스트로"""
+    return list(iter_parsed(paths, workers))
+
+
+def iter_csv_batches(rebuild_cache=False, workers=1, spec=None, paths=None):
+    """
+    data/csv/ 의 CSV 를 파일명 순서대로 (경로, 레코드 튜플 리스트, 캐시 여부, SHA-1) 반환
+    paths 가 있으면 그 파일들만 읽는다 (캐시 정리는 data/csv/ 전체 기준).
+    SHA-1 은 캐시 항목의 값 (걸러 읽어 캐시에 넣지 않은 파일은 None)
+    캐시 미스 파일은 미리 병렬 파싱을 걸어두고 차례가 오면 결과를 받는다
+    → 한 번에 메모리에 올라가는 것은 파일 하나 분량
+
+    spec (RowFilter) 가 있으면 캐시 적중 파일은 레코드에 spec.keep() 을 적용하고,
+    미스 파일은 spec 을 넣어 파싱한다 (걸러진 결과이므로 캐시에는 저장하지 않음).
+    spec.cacheable 이 아니면 (해제 거래 제외) 캐시를 쓰지 않고 모두 파싱.
+    """
+    live = sorted(glob.glob(os.path.join(CSV_DIR, '*.csv')))
+    if not live:
         print(f"❌ {CSV_DIR}/ 디렉토리에 CSV 파일이 없습니다!")
         print(f"   rt.molit.go.kr에서 CSV를 다운받아 {CSV_DIR}/ 에 넣어주세요.")
         exit(1)
+    csv_files = live if paths is None else sorted(paths)
 
-    print(f"📂 CSV 파일 {len(csv_files)}개 발견\n")
+    print(f"📂 CSV 파일 {len(csv_files)}개 {'발견' if paths is None else '읽기'}\n")
+    LOAD_STATS.clear()
+    LOAD_STATS.update({
+        'files': len(csv_files),
+        'csv_bytes': sum(os.path.getsize(p) for p in csv_files),
+        'rows_read': 0,
+        'rows_unique': 0,
+    })
 
-    all_items = []
-    seen = set()  # 중복 제거용
+    cache = CsvCache(rebuild=rebuild_cache or (spec is not None and not spec.cacheable))
+    cache.prune(live)
 
+    hit = {p for p in csv_files if cache.has(p)}
+    parsed = iter_parsed([p for p in csv_files if p not in hit], workers, spec)
+
+    # 항상 파일명 정렬 순서 → 워커 수와 무관하게 결과 동일
     for filepath in csv_files:
-        fname = os.path.basename(filepath)
-        items = load_csv_file(filepath)
+        if filepath in hit:
+            rows = cache.get(filepath)
+            if spec is not None:
+                rows = [spec.project(r) for r in rows if spec.keep(r)]
+            yield filepath, rows, True, cache.entries[filepath]['sha1']
+        else:
+            blob = next(parsed)
+            sha1 = None
+            if spec is None:
+                cache.put(filepath, blob)
+                sha1 = cache.entries[filepath]['sha1']
+            yield filepath, unpack_records(blob), False, sha1
+
+    if spec is None or spec.cacheable:
+        cache.save()
+    LOAD_STATS['cache_hits'] = cache.hits
+    LOAD_STATS['cache_misses'] = cache.misses
+    print(f"  → 캐시 적중 {cache.hits}개 / 파싱 {cache.misses}개")
+    print(f"  → 인코딩 대체 디코딩 {ENCODING_STATS['fallback_files']}개 파일"
+          f" ({ENCODING_STATS['fallback_lines']}줄)")
+    ast = ADDRESS_RESOLVER.stats()
+    if ast['hits'] + ast['misses']:
+        print(f"  → 주소 캐시 적중 {ast['hits']} / 미스 {ast['misses']}")
+
+
+def iter_transactions(rebuild_cache=False, workers=1, dedup=None, spec=None, paths=None):
+    """
+    중복 제거된 거래 레코드 튜플 스트림 (RECORD_FIELDS 순서)
+    dedup: DedupIndex (기본: 새 인덱스). 이미 들어 있는 거래는 건너뛴다.
+    spec / paths: iter_csv_batches 참고
+    """
+    if dedup is None:
+        dedup = DedupIndex()
+    total = 0
 
+    for filepath, rows, cached, sha1 in iter_csv_batches(rebuild_cache, workers, spec, paths):
+        fname = os.path.basename(filepath)
         # 중복 제거 (같은 거래 건이 여러 CSV에 포함될 수 있음)
         new_count = 0
-        for it in items:
-            key = (
-                it['apt_name'], it['region_code'], it['area_m2'],
-                it['deal_year'], it['deal_month'], it['deal_day'],
-                it['price'], it['floor']
-            )
-            if key not in seen:
-                seen.add(key)
-                all_items.append(it)
+        for row in rows:
+            if dedup.add(row):
                 new_count += 1
+                yield row
+        if sha1 is not None:
+            dedup.mark_file(filepath, sha1)
+
+        total += new_count
+        LOAD_STATS['rows_read'] += len(rows)
+        LOAD_STATS['rows_unique'] += new_count
+        tag = ' (캐시)' if cached else ''
+        print(f"  ✅ {fname}: {len(rows)}건 로드{tag}, {new_count}건 추가 (중복 {len(rows)-new_count}건 제외)")
 
-        print(f"  ✅ {fname}: {len(items)}건 로드, {new_count}건 추가 (중복 {len(items)-new_count}건 제외)")
+    print(f"\n  → 총 {total}건 (중복 제거 후)")
+    if dedup.verify:
+        print(f"  → 해시 충돌 {dedup.collisions}건")
+    print()
 
-    print(f"\n  → 총 {len(all_items)}건 (중복 제거 후)\n")
-    return all_items
+
+def load_all_csv(rebuild_cache=False, workers=1, dedup=None, spec=None):
+    """data/csv/ 디렉토리의 모든 CSV 파일을 읽어 통합 TxTable 반환"""
+    table = TxTable()
+    for row in iter_transactions(rebuild_cache, workers, dedup, spec):
+        table.append(row)
+    return table
+
+
+# ════════════════════════════════════════
+# CSV 다운로드 (--fetch)
+# ════════════════════════════════════════
+
+FETCH_CONNECTIONS = 6     # 호스트별 최대 동시 연결 (keep-alive 로 재사용)
+FETCH_PER_SIDO = 1        # 시도별 동시 다운로드 수
+FETCH_RETRIES = 4         # 파일별 재시도 횟수
+FETCH_BACKOFF = 0.5       # 첫 재시도 대기(초), 이후 2배씩 + 무작위 지연
+FETCH_TIMEOUT = 60
+FETCH_CHUNK = 256 * 1024
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    """재시도해도 소용없는 다운로드 실패 (404 등)"""
+
+
+class RetryableStatus(Exception):
+    """재시도 대상 HTTP 상태 (503 등)"""
+
+
+def load_sources(path):
+    """
+    다운로드 목록 JSON 읽기
+
+        {"files": [{"name": "서울.csv", "sido": "서울시", "url": "https://...",
+                    "data": {...}}]}
+
+    name 생략 시 URL 의 파일명, sido 생략 시 name (= 파일별 제한 없음)
+    data 가 있으면 폼 POST (이어받기 없이 매번 처음부터)
+    """
+    with open(path, encoding='utf-8') as f:
+        files = json.load(f)['files']
+    for src in files:
+        src.setdefault('name', unquote(os.path.basename(urlsplit(src['url']).path)))
+        src.setdefault('sido', src['name'])
+    return files
+
+
+class ConnectionPool:
+    """
+    호스트별 keep-alive 연결 풀 (호스트당 최대 size 개)
+    연결 대여/반납은 이벤트 루프에서, 실제 요청은 스레드에서 http.client 로 수행
+    """
+
+    def __init__(self, size=FETCH_CONNECTIONS, timeout=FETCH_TIMEOUT):
+        self.size = size
+        self.timeout = timeout
+        self.idle = defaultdict(list)
+        self.slots = {}
+        self.opened = 0
+
+    @asynccontextmanager
+    async def connection(self, scheme, netloc):
+        origin = (scheme, netloc)
+        if origin not in self.slots:
+            self.slots[origin] = asyncio.Semaphore(self.size)
+        async with self.slots[origin]:
+            if self.idle[origin]:
+                conn = self.idle[origin].pop()
+            else:
+                cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+                conn = cls(netloc, timeout=self.timeout)
+                self.opened += 1
+            try:
+                yield conn
+            except BaseException:
+                conn.close()  # 응답을 다 읽지 못한 연결은 재사용하지 않음
+                raise
+            self.idle[origin].append(conn)
+
+    def close(self):
+        for conns in self.idle.values():
+            for conn in conns:
+                conn.close()
+        self.idle.clear()
+
+
+def http_download(conn, method, target, body, part, resume):
+    """
+    한 번의 요청으로 part 파일을 채움 (스레드에서 실행)
+    resume 이면 이미 받은 만큼 Range 로 요청해 206 은 이어쓰고 200 은 처음부터 다시 씀.
+    검증자(ETag / Last-Modified)는 part + '.json' 에 두고 If-Range 로 보내
+    그 사이 원본이 바뀌었으면 서버가 전체를 다시 보내게 한다.
+    반환: 이어받은 시작 위치 (0 = 처음부터)
+    """
+    meta_path = part + '.json'
+    meta = {}
+    if resume and os.path.exists(part) and os.path.exists(meta_path):
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+    have = os.path.getsize(part) if meta else 0
+    validator = meta.get('etag') or meta.get('last_modified')
+    headers = {'Accept-Encoding': 'identity'}
+    if body is not None:
+        headers['Content-Type'] = 'application/x-www-form-urlencoded'
+    if have and validator:
+        headers['Range'] = f'bytes={have}-'
+        headers['If-Range'] = validator
+    else:
+        have = 0
+
+    conn.request(method, target, body=body, headers=headers)
+    resp = conn.getresponse()
+    if resp.status == 416:
+        # 받아둔 부분이 서버 파일보다 길다 → 버리고 처음부터
+        resp.read()
+        os.remove(part)
+        raise RetryableStatus(416)
+    if resp.status in RETRY_STATUS:
+        resp.read()
+        raise RetryableStatus(resp.status)
+    if resp.status not in (200, 206):
+        resp.read()
+        raise FetchError(f'HTTP {resp.status} {resp.reason}')
+
+    start = 0
+    if resp.status == 206:
+        m = re.match(r'bytes (\d+)-', resp.getheader('Content-Range', ''))
+        start = int(m.group(1)) if m else -1
+        if start != have:
+            resp.read()
+            os.remove(part)
+            raise RetryableStatus(206)
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump({'etag': resp.getheader('ETag'),
+                   'last_modified': resp.getheader('Last-Modified')}, f)
+    # 받는 대로 기록 → 도중에 끊겨도 받은 부분은 남아 다음 시도에서 이어받음
+    # (read(amt) 는 연결이 끊겨도 예외 없이 b'' 를 돌려주므로 길이를 직접 확인)
+    length = resp.getheader('Content-Length')
+    got = 0
+    with open(part, 'ab' if start else 'wb') as f:
+        while True:
+            chunk = resp.read(FETCH_CHUNK)
+            if not chunk:
+                break
+            f.write(chunk)
+            got += len(chunk)
+    if length is not None and got < int(length):
+        conn.close()
+        raise http.client.IncompleteRead(b'', int(length) - got)
+    return start
+
+
+def finish_download(part, dest):
+    """
+    part → dest 교체. 내용이 기존 파일과 같으면 기존 파일(mtime)을 그대로 두어
+    파싱 캐시가 그대로 적중하게 한다. 반환: 내용이 바뀌었는지
+    """
+    os.remove(part + '.json')
+    if os.path.exists(dest) and file_sha1(dest) == file_sha1(part):
+        os.remove(part)
+        return False
+    os.replace(part, dest)
+    return True
+
+
+async def fetch_one(pool, sido_slot, src, dest_dir, retries, backoff):
+    """파일 하나 다운로드 (시도별 제한 + 재시도). 반환: 결과 dict"""
+    url = urlsplit(src['url'])
+    target = (url.path or '/') + (f'?{url.query}' if url.query else '')
+    body = urlencode(src['data']).encode() if src.get('data') else None
+    dest = os.path.join(dest_dir, src['name'])
+    part = dest + '.part'
+    res = {'name': src['name'], 'sido': src['sido'], 'retries': 0, 'resumed': 0}
+
+    res['seconds'] = 0.0  # 실제 전송 시간 합 (연결/시도 대기, 백오프 제외)
+    async with sido_slot:
+        for attempt in range(retries + 1):
+            try:
+                async with pool.connection(url.scheme, url.netloc) as conn:
+                    t0 = time.perf_counter()
+                    try:
+                        start = await asyncio.to_thread(
+                            http_download, conn, 'POST' if body else 'GET', target,
+                            body, part, body is None)
+                    finally:
+                        res['seconds'] += time.perf_counter() - t0
+                res['resumed'] += start > 0
+                break
+            except (OSError, http.client.HTTPException, RetryableStatus) as e:
+                if attempt == retries:
+                    raise FetchError(f'{type(e).__name__}: {e}') from e
+                res['retries'] += 1
+                delay = backoff * (2 ** attempt) * (1 + random.random())
+                print(f"  ↻ {src['name']}: {type(e).__name__} {e!r} → {delay:.1f}초 후 재시도")
+                await asyncio.sleep(delay)
+    res['changed'] = finish_download(part, dest)
+    res['path'] = dest
+    res['bytes'] = os.path.getsize(dest)
+    return res
+
+
+async def fetch_sources(sources, dest_dir, cache, workers, connections, per_sido,
+                        retries, backoff):
+    """
+    전체 다운로드. 한 파일이 끝나는 즉시 파싱을 걸어 (workers > 1 이면 프로세스 풀)
+    나머지 다운로드와 겹치게 하고, 결과는 cache 에 넣어 이어지는 로드에서 적중시킨다.
+    """
+    loop = asyncio.get_running_loop()
+    pool = ConnectionPool(connections)
+    sido_slots = defaultdict(lambda: asyncio.Semaphore(per_sido))
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    parsing = {}
+    results, failed = [], []
+
+    async def run(src):
+        try:
+            res = await fetch_one(pool, sido_slots[src['sido']], src, dest_dir, retries, backoff)
+        except FetchError as e:
+            failed.append(src['name'])
+            print(f"  ❌ {src['name']}: {e}")
+            return
+        results.append(res)
+        tag = '' if res['changed'] else ' (변경 없음)'
+        extra = f", 이어받기 {res['resumed']}회" if res['resumed'] else ''
+        print(f"  ⬇️ {res['name']}: {res['bytes'] / 1e6:.1f}MB {res['seconds']:.1f}초"
+              f" (재시도 {res['retries']}회{extra}){tag}")
+        if cache is not None and not cache.has(res['path']):
+            parsing[res['path']] = loop.run_in_executor(executor, parse_to_blob, res['path'])
+
+    try:
+        await asyncio.gather(*(run(src) for src in sources))
+        for path, fut in parsing.items():
+            blob, stats, addr = await fut
+            for k, v in stats.items():
+                ENCODING_STATS[k] += v
+            if executor is not None:
+                ADDRESS_RESOLVER.merge_stats(addr)
+            cache.put(path, blob)
+    finally:
+        pool.close()
+        if executor is not None:
+            executor.shutdown()
+    return results, failed, pool.opened, len(parsing)
+
+
+def fetch_csv(sources, dest_dir=CSV_DIR, cache=None, workers=1,
+              connections=FETCH_CONNECTIONS, per_sido=FETCH_PER_SIDO,
+              retries=FETCH_RETRIES, backoff=FETCH_BACKOFF):
+    """
+    sources (load_sources 결과) 를 동시에 내려받아 dest_dir 에 저장
+    전체 소요 ≈ 가장 느린 시도 하나 (연결 수 / 시도별 제한 안에서)
+    반환: 통계 dict (METRICS 스팬 속성)
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    t0 = time.perf_counter()
+    results, failed, opened, parsed = asyncio.run(fetch_sources(
+        sources, dest_dir, cache, workers, connections, per_sido, retries, backoff))
+    if cache is not None:
+        cache.save()
+    wall = time.perf_counter() - t0
+    serial = sum(r['seconds'] for r in results)
+    slowest = max((r['seconds'] for r in results), default=0)
+    print(f"\n  → {len(results)}개 다운로드 ({sum(r['changed'] for r in results)}개 변경,"
+          f" 실패 {len(failed)}개) {wall:.1f}초"
+          f" / 파일별 합 {serial:.1f}초, 가장 느린 파일 {slowest:.1f}초")
+    print(f"  → 연결 {opened}개 사용, 미리 파싱 {parsed}개\n")
+    return {
+        'files': len(results),
+        'failed': failed,
+        'changed': sum(r['changed'] for r in results),
+        'bytes_in': sum(r['bytes'] for r in results),
+        'retries': sum(r['retries'] for r in results),
+        'resumed': sum(r['resumed'] for r in results),
+        'connections': opened,
+        'parsed_ahead': parsed,
+        'serial_seconds': round(serial, 3),
+        'slowest_seconds': round(slowest, 3),
+    }
 
 
 # ════════════════════════════════════════
@@ -378,183 +1596,675 @@ def fp(p):
     return f"{b}억 {r:,}만" if b > 0 else f"{p:,}만"
 
 
+# ════════════════════════════════════════
+# 집계 엔진 (두 대시보드 공용)
+# ════════════════════════════════════════
+
+class TopK:
+    """
+    키별 점수를 받아 상위 k 개만 유지하는 최소 힙
+
+    같은 키의 점수는 커지기만 한다고 가정한다 (단지별 최고가).
+    점수가 갱신되면 새 항목을 넣고 이전 항목은 지연 삭제한다.
+    동점은 seq 가 작은 (먼저 등장한) 키가 우선.
+    """
+
+    __slots__ = ('k', 'heap', 'live')
+
+    def __init__(self, k):
+        self.k = k
+        self.heap = []   # (score, -seq, key) 최소 힙
+        self.live = {}   # key → 현재 유효한 힙 항목
+
+    def offer(self, key, score, seq):
+        entry = (score, -seq, key)
+        cur = self.live.get(key)
+        if cur is not None:
+            if score > cur[0]:
+                self._push(entry)
+            return
+        if len(self.live) < self.k:
+            self._push(entry)
+            return
+        self._drop_stale()
+        worst = self.heap[0]
+        if entry[:2] > worst[:2]:
+            del self.live[worst[2]]
+            self.live[key] = entry
+            heapq.heapreplace(self.heap, entry)
+
+    def _push(self, entry):
+        self.live[entry[2]] = entry
+        heapq.heappush(self.heap, entry)
+        self._compact()
+
+    def _drop_stale(self):
+        heap, live = self.heap, self.live
+        while heap and live.get(heap[0][2]) is not heap[0]:
+            heapq.heappop(heap)
+
+    def _compact(self):
+        if len(self.heap) > 2 * self.k + 16:
+            self.heap = list(self.live.values())
+            heapq.heapify(self.heap)
+
+    def keys(self):
+        """점수 내림차순 (동점은 seq 오름차순) 키 리스트"""
+        return [e[2] for e in sorted(self.live.values(), reverse=True)]
+
+    def __len__(self):
+        return len(self.live)
+
+
+def row_record(row):
+    """RECORD_FIELDS 순서 튜플 → dict"""
+    return dict(zip(RECORD_FIELDS, row))
+
+
+class MonthlyAggregate:
+    """
+    거래 1회 순회로 두 대시보드에 필요한 값을 모두 집계
+
+      cells : (region, apt, ym) → [건수, 평당가 합계, 평당가 최고, 평당가 최저]
+      best  : (region, apt) → [최근 기간 최고가 거래 ref, 첫 등장 순번, 평당가]
+      rows / recent : region → 전체 / 최근 기간 거래 건수
+      tops  : region → TopK (지역별 TOP region_k, 최근 기간 최고가 기준)
+      boards: 이름 → TopK (지역 묶음별 TOP N, 예: 서울 TOP 20)
+
+    region 은 지역코드, apt 는 단지명 문자열, ym 은 YYYYMM 정수.
+    ref 는 최고가 거래를 가리키는 값으로, 입력 방식에 따라
+    TxTable 행 번호(feed_table) 또는 레코드 튜플(feed_rows)이다.
+    boards 인자는 {이름: (지역코드 집합, N)} 형태.
+    backend 는 feed_table 구현 선택: 'python' (행 단위 add) / 'numpy' (그룹 단위 벡터 연산)
+    / 'auto' (NumPy 가 있으면 numpy). 두 구현의 결과는 같다 (bench.py backends 로 확인).
+
+    상태 크기는 (단지 × 월) 개수에 비례하고 거래 건수와 무관하다.
+    """
+
+    def __init__(self, recent_months, region_k=10, boards=None, backend='auto'):
+        if backend == 'auto':
+            backend = 'numpy' if np is not None else 'python'
+        if backend == 'numpy' and np is None:
+            raise RuntimeError("NumPy 가 설치돼 있지 않습니다 (--backend python 사용)")
+        self.backend = backend
+        self.recent_months = recent_months
+        self.region_k = region_k
+        self.cells = {}
+        self.best = {}
+        self.rows = defaultdict(int)
+        self.recent = defaultdict(int)
+        self.tops = {}
+        self.board_specs = dict(boards or {})
+        self.boards = {name: TopK(n) for name, (_codes, n) in self.board_specs.items()}
+        self._region_boards = {}  # region → 이 지역이 속한 TopK 리스트
+        self.months = []
+        self.record = row_record
+
+    def _boards_for(self, r):
+        bl = self._region_boards.get(r)
+        if bl is None:
+            bl = [self.boards[name] for name, (codes, _n) in self.board_specs.items()
+                  if r in codes]
+            self._region_boards[r] = bl
+        return bl
+
+    def add(self, r, a, m, p, ref):
+        """거래 1건 반영"""
+        cells = self.cells
+        cell = cells.get((r, a, m))
+        if cell is None:
+            cells[(r, a, m)] = [1, p, p, p]
+        else:
+            cell[0] += 1
+            cell[1] += p
+            if p > cell[2]:
+                cell[2] = p
+            elif p < cell[3]:
+                cell[3] = p
+        self.rows[r] += 1
+        if m not in self.recent_months:
+            return
+        self.recent[r] += 1
+        best = self.best
+        b = best.get((r, a))
+        if b is None:
+            b = best[(r, a)] = [ref, len(best), p]
+        elif p > b[2]:
+            b[0] = ref
+            b[2] = p
+        else:
+            return
+        # 단지 최고가가 갱신된 경우에만 순위표 반영
+        top = self.tops.get(r)
+        if top is None:
+            top = self.tops[r] = TopK(self.region_k)
+        top.offer((r, a), p, b[1])
+        for board in self._boards_for(r):
+            board.offer((r, a), p, b[1])
+
+    def feed_rows(self, rows):
+        """레코드 튜플 스트림 반영 (리스트로 모으지 않음)"""
+        add = self.add
+        for row in rows:
+            add(row[13], row[0], ym_code(row[8], row[9]), row[7], row)
+        self.record = row_record
+        self._finish()
+        return self
+
+    def feed_table(self, table):
+        """TxTable 전체 반영 (ref = 행 번호)"""
+        if self.backend == 'numpy' and len(table) and not self.cells:
+            return self._feed_table_numpy(table)
+        add = self.add
+        regions, apts = table.region_pool.values, table.apt_pool.values
+        region, apt, ppy, ym = table.region, table.apt, table.ppy, table.ym
+        for i in range(len(table)):
+            add(regions[region[i]], apts[apt[i]], ym[i], ppy[i], i)
+        self.record = table.record
+        self._finish()
+        return self
+
+    def _feed_table_numpy(self, table):
+        """
+        feed_table 의 NumPy 구현
+        (region, apt, ym) 을 정수 코드로 묶어 건수/합계/최고/최저를 bincount·ufunc.at 으로 한 번에 구하고,
+        최근 기간 단지별 최고가 거래(동점이면 먼저 나온 행)와 첫 등장 순번도 정렬로 구한다.
+        dict/TopK 갱신은 행 수가 아니라 그룹 수만큼만 돈다.
+        삽입 순서와 순위표 결과는 행 단위 add 와 같다 (TopK 는 단지별 최종 점수만 넣어도 결과가 같음).
+        """
+        regions, apts = table.region_pool.values, table.apt_pool.values
+        reg = np.frombuffer(table.region, dtype=np.uint32).astype(np.int64)
+        apt = np.frombuffer(table.apt, dtype=np.uint32).astype(np.int64)
+        ym = np.frombuffer(table.ym, dtype=np.uint32).astype(np.int64)
+        ppy = np.frombuffer(table.ppy, dtype=np.int64)
+        na = len(apts)
+
+        # 셀: (region, apt, ym) 그룹별 [건수, 합계, 최고, 최저] — 첫 등장 순으로 dict 에 넣음
+        months, mi = np.unique(ym, return_inverse=True)
+        key = (reg * na + apt) * len(months) + mi
+        ukey, first, g = np.unique(key, return_index=True, return_inverse=True)
+        cnt = np.bincount(g, minlength=len(ukey))
+        tot = np.zeros(len(ukey), dtype=np.int64)
+        np.add.at(tot, g, ppy)
+        mx = np.full(len(ukey), np.iinfo(np.int64).min, dtype=np.int64)
+        np.maximum.at(mx, g, ppy)
+        mn = np.full(len(ukey), np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(mn, g, ppy)
+        order = np.argsort(first, kind='stable')
+        ra, cm = np.divmod(ukey[order], len(months))
+        cells = self.cells
+        for r, a, m, c, t, x, y in zip((ra // na).tolist(), (ra % na).tolist(),
+                                       months[cm].tolist(), cnt[order].tolist(),
+                                       tot[order].tolist(), mx[order].tolist(),
+                                       mn[order].tolist()):
+            cells[(regions[r], apts[a], m)] = [c, t, x, y]
+        self._count_regions(self.rows, reg, regions)
+
+        # 최근 기간: 단지별 최고가 거래 + 첫 등장 순번
+        idx = np.nonzero(np.isin(ym, np.fromiter(self.recent_months, dtype=np.int64)))[0]
+        if len(idx):
+            self._count_regions(self.recent, reg[idx], regions)
+            k2 = reg[idx] * na + apt[idx]
+            # 단지별 (평당가 내림차순, 행 번호 오름차순) 첫 행 = 최고가 거래
+            srt = np.lexsort((idx, -ppy[idx], k2))
+            head = np.ones(len(srt), dtype=bool)
+            head[1:] = k2[srt][1:] != k2[srt][:-1]
+            best_rows = idx[srt][head]
+            # 단지별 첫 등장 행 → 순번
+            _, first2 = np.unique(k2, return_index=True)
+            by_seq = np.argsort(first2, kind='stable')
+            best = self.best
+            for seq, i in enumerate(best_rows[by_seq].tolist()):
+                r, a, p = regions[table.region[i]], apts[table.apt[i]], table.ppy[i]
+                best[(r, a)] = [i, seq, p]
+                top = self.tops.get(r)
+                if top is None:
+                    top = self.tops[r] = TopK(self.region_k)
+                top.offer((r, a), p, seq)
+                for board in self._boards_for(r):
+                    board.offer((r, a), p, seq)
+
+        self.record = table.record
+        self._finish()
+        return self
+
+    @staticmethod
+    def _count_regions(counts, reg, regions):
+        """지역별 건수를 첫 등장 순으로 counts 에 더함"""
+        u, first, c = np.unique(reg, return_index=True, return_counts=True)
+        for j in np.argsort(first, kind='stable').tolist():
+            counts[regions[int(u[j])]] += int(c[j])
+
+    def _finish(self):
+        self.months = sorted({k[2] for k in self.cells})
+
+    def avg(self, r, a, m):
+        """(region, apt, ym) 월평균 평당가, 거래 없으면 None"""
+        cell = self.cells.get((r, a, m))
+        return round(cell[1] / cell[0]) if cell else None
+
+    def series(self, r, a, months=None):
+        return [self.avg(r, a, m) for m in (self.months if months is None else months)]
+
+    def pooled_avg(self, keys, months=None):
+        """여러 (region, apt) 를 합친 월평균 → {ym: 평균} (거래 있는 달만)"""
+        out = {}
+        for m in (self.months if months is None else months):
+            total = n = 0
+            for r, a in keys:
+                cell = self.cells.get((r, a, m))
+                if cell:
+                    n += cell[0]
+                    total += cell[1]
+            if n:
+                out[m] = round(total / n)
+        return out
+
+    def active_months(self, keys):
+        """keys 중 하나라도 거래가 있는 달 (정렬)"""
+        return [m for m in self.months
+                if any((r, a, m) in self.cells for r, a in keys)]
+
+    def top_records(self, top):
+        """TopK → 최고가 거래 dict 리스트 (순위 순)"""
+        return [self.record(self.best[key][0]) for key in top.keys()]
+
+    def region_tops(self):
+        """지역별 TOP → {region: 거래 dict 리스트} (지역은 최근 기간 첫 등장 순)"""
+        return {r: self.top_records(top) for r, top in self.tops.items()}
+
+    def board(self, name):
+        return self.top_records(self.boards[name])
+
+
+# ════════════════════════════════════════
+# 월별 집계 저장소 (원본 CSV 없이 장기 추이 유지)
+# ════════════════════════════════════════
+
+class AggregateStore:
+    """
+    (지역코드, 단지명, 월) → 건수 / 평당가 합계 / 최저 / 최고 를 SQLite 에 보관
+
+      sync(agg)      : 이번 집계에 있는 달 중 내용이 바뀐 달만 교체 (달마다 digest 비교)
+      load_into(agg) : 이번 CSV 에 없는 과거 달을 집계에 합침 → 추이 차트가 원본 없이도 이어짐
+
+    현재 CSV 에 들어 있는 달은 CSV 쪽이 기준이다 (중복 제거 후 전체 재집계 결과로 교체).
+    CSV 를 지워도 저장소의 달은 남는다.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cells (
+            ym INTEGER NOT NULL, region TEXT NOT NULL, apt TEXT NOT NULL,
+            count INTEGER NOT NULL, sum INTEGER NOT NULL,
+            min INTEGER NOT NULL, max INTEGER NOT NULL,
+            PRIMARY KEY (ym, region, apt)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS months (
+            ym INTEGER PRIMARY KEY, digest TEXT NOT NULL, cells INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(self.SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def months(self):
+        """{ym: digest}"""
+        return dict(self.db.execute("SELECT ym, digest FROM months"))
+
+    @staticmethod
+    def month_cells(agg, months=None):
+        """agg.cells → {ym: [(region, apt, count, sum, min, max), ...] (정렬)}"""
+        by_month = defaultdict(list)
+        for (r, a, m), (c, t, mx, mn) in agg.cells.items():
+            if months is None or m in months:
+                by_month[m].append((r, a, c, t, mn, mx))
+        for rows in by_month.values():
+            rows.sort()
+        return by_month
+
+    def sync(self, agg, months=None):
+        """바뀐 달만 교체 → 교체한 달 리스트 (months: 확인할 달, None = 전체)"""
+        stored = self.months()
+        changed = []
+        with self.db:
+            for m, rows in sorted(self.month_cells(agg, months).items()):
+                digest = hashlib.sha1(repr(rows).encode('utf-8')).hexdigest()
+                if stored.get(m) == digest:
+                    continue
+                self.db.execute("DELETE FROM cells WHERE ym = ?", (m,))
+                self.db.executemany(
+                    "INSERT INTO cells (ym, region, apt, count, sum, min, max) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", ((m,) + row for row in rows))
+                self.db.execute("INSERT OR REPLACE INTO months (ym, digest, cells) VALUES (?, ?, ?)",
+                                (m, digest, len(rows)))
+                changed.append(m)
+        return changed
+
+    def load_into(self, agg, since=0):
+        """저장소에만 있는 since 이후의 달을 agg.cells 에 추가 → 추가한 달 리스트"""
+        have = set(agg.months)
+        extra = [m for m in sorted(self.months()) if m >= since and m not in have]
+        cells = agg.cells
+        for m in extra:
+            for r, a, c, t, mn, mx in self.db.execute(
+                    "SELECT region, apt, count, sum, min, max FROM cells WHERE ym = ?", (m,)):
+                cells[(r, a, m)] = [c, t, mx, mn]
+        if extra:
+            agg._finish()
+        return extra
+
+
+# ════════════════════════════════════════
+# 거래 창고 (SQLite, 임의 조회용)
+# ════════════════════════════════════════
+
+class Warehouse:
+    """
+    중복 제거된 전체 거래를 SQLite 테이블 tx 에 보관 (RECORD_FIELDS + ym, seq = 적재 순서)
+
+    인덱스: (region_code, ym) / (apt_name, region_code) / price_per_pyeong
+    ingest() 는 전체를 다시 적재하고 append() 는 뒤에 덧붙인다. iter_rows() 는 적재
+    순서 그대로 돌려주므로 --from-warehouse 로 만든 대시보드는 CSV 에서 만든 것과 같다.
+    """
+
+    INDEXES = {
+        'tx_region_ym': '(region_code, ym)',
+        'tx_apt_region': '(apt_name, region_code)',
+        'tx_ppy': '(price_per_pyeong)',
+    }
+
+    def __init__(self, path=WAREHOUSE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.db = sqlite3.connect(path)
+
+    def close(self):
+        self.db.close()
+
+    def _insert(self, rows):
+        cols = ', '.join(RECORD_FIELDS)
+        marks = ', '.join('?' * (len(RECORD_FIELDS) + 1))
+        self.db.executemany(f"INSERT INTO tx ({cols}, ym) VALUES ({marks})",
+                            (row + (ym_code(row[8], row[9]),) for row in rows))
+
+    def count(self):
+        """tx 행 수 (테이블이 없으면 None)"""
+        try:
+            return self.db.execute("SELECT COUNT(*) FROM tx").fetchone()[0]
+        except sqlite3.OperationalError:
+            return None
+
+    def ingest(self, rows):
+        """RECORD_FIELDS 순서 튜플 스트림으로 tx 재작성 → 적재 건수"""
+        db = self.db
+        with db:
+            db.execute("DROP TABLE IF EXISTS tx")
+            db.execute(f"""
+                CREATE TABLE tx (
+                    seq INTEGER PRIMARY KEY,
+                    apt_name TEXT, sido TEXT, sigungu TEXT, dong TEXT,
+                    area_m2 REAL, area_pyeong REAL, price INTEGER, price_per_pyeong INTEGER,
+                    deal_year TEXT, deal_month TEXT, deal_day TEXT,
+                    floor TEXT, build_year TEXT, region_code TEXT, ym INTEGER
+                )""")
+            self._insert(rows)
+            # 인덱스는 적재 후 한 번에 (행마다 갱신하는 것보다 빠름)
+            for name, spec in self.INDEXES.items():
+                db.execute(f"CREATE INDEX {name} ON tx {spec}")
+        db.execute("ANALYZE")
+        return self.count()
+
+    def append(self, rows):
+        """기존 tx 뒤에 덧붙임 (seq 는 이어서 증가) → 추가 건수"""
+        before = self.count()
+        with self.db:
+            self._insert(rows)
+        return self.count() - before
+
+    def iter_rows(self):
+        """적재 순서대로 RECORD_FIELDS 튜플"""
+        return self.db.execute(f"SELECT {', '.join(RECORD_FIELDS)} FROM tx ORDER BY seq")
+
+    def query(self, sql, params=()):
+        """(컬럼명 리스트, 행 리스트)"""
+        cur = self.db.execute(sql, params)
+        return [d[0] for d in cur.description or ()], cur.fetchall()
+
+
+def ingest_warehouse(rebuild_cache=False, workers=1, verify=False,
+                     path=WAREHOUSE_PATH, index_path=DEDUP_INDEX_PATH):
+    """
+    --ingest: data/csv → SQLite 창고. 창고에 든 거래의 DedupIndex 를 index_path 에 저장
+
+    저장된 인덱스가 창고 행 수와 맞고, 인덱스에 기록된 CSV 가 그대로이며, 새 CSV 가 모두
+    그 뒤 파일명이면 새 CSV 만 읽어 새 거래만 덧붙인다 (적재 순서가 전체 재적재와 같음).
+    CSV 교체 / 삭제 / 중간 삽입, --rebuild-cache, --verify-dedup 이면 전체 재적재.
+    → (적재 방식, 창고 행 수)
+    """
+    csv_files = sorted(glob.glob(os.path.join(CSV_DIR, '*.csv')))
+    wh = Warehouse(path)
+    prev = new = None
+    if not (rebuild_cache or verify) and os.path.exists(index_path):
+        try:
+            prev = DedupIndex.load(index_path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"  ⚠️ 중복 인덱스 읽기 실패, 전체 재적재: {e}")
+    if prev is not None and prev.count == wh.count():
+        old = sorted(prev.files)
+        new = [p for p in csv_files if p not in prev.files]
+        if (not all(os.path.exists(p) and prev.covers(p) for p in old)
+                or (new and old and min(new) < old[-1])):
+            new = None
+
+    if new is None:
+        dedup = DedupIndex(verify=verify)
+        wh.ingest(iter_transactions(rebuild_cache, workers, dedup))
+        how = '전체 재적재'
+    elif new:
+        dedup = prev
+        added = wh.append(iter_transactions(rebuild_cache, workers, dedup, paths=new))
+        how = f"새 CSV {len(new)}개에서 {added}건 추가"
+    else:
+        dedup = prev
+        LOAD_STATS.clear()
+        LOAD_STATS.update(files=0, csv_bytes=0, rows_read=0, rows_unique=0,
+                          cache_hits=0, cache_misses=0)
+        how = '새 CSV 없음'
+    n = wh.count()
+    wh.close()
+    # 창고가 커밋된 뒤에 저장 → 중간에 실패하면 행 수가 달라 다음엔 전체 재적재
+    dedup.save(index_path)
+    return how, n
+
+
 # ════════════════════════════════════════
 # 대시보드 1: 전국 구별 TOP 10
 # ════════════════════════════════════════
 
-def build_district_data(recent, alldata, months_6_set):
-    """전국 구별 TOP 10 JSON 생성"""
-    print("── 전국 구별 TOP 10 생성 ──")
+def encode_series(vals):
+    """
+    월별 평당가 배열(None = 거래 없음) → 희소 델타 인코딩
+    [월 인덱스 증분, 값 증분, 월 인덱스 증분, 값 증분, ...]
+    첫 쌍은 (인덱스, 값) 그대로. index.html 의 decodeSeries 와 짝.
+      [None, 100, 120, None, 90] → [1, 100, 1, 20, 2, -30]
+    """
+    out = []
+    pi = pv = 0
+    for i, v in enumerate(vals):
+        if v is None:
+            continue
+        out += (i - pi, v - pv)
+        pi, pv = i, v
+    return out
+
+
+# top10 행은 필드명 없이 이 순서의 배열로 저장 (index.html 에서 객체로 복원)
+DISTRICT_FIELDS = ['name', 'dong', 'area_m2', 'area_pyeong', 'price', 'ppyeong',
+                   'ymd', 'floor', 'build_year']
+
 
-    # 구별 그룹핑 (최근 6개월)
-    by_district = defaultdict(list)
-    for it in recent:
-        key = f"{it['sido']}|{it['sigungu']}"
-        by_district[key].append(it)
-
-    # 구별 TOP 10
-    top10_map = {}
-    for key, items in by_district.items():
-        best = {}
-        for it in items:
-            aname = it['apt_name']
-            if aname not in best or it['price_per_pyeong'] > best[aname]['price_per_pyeong']:
-                best[aname] = it
-        t10 = sorted(best.values(), key=lambda x: x['price_per_pyeong'], reverse=True)[:10]
-        if t10:
-            top10_map[key] = t10
-
-    # 전체 월별 라벨
-    all_months_set = set()
-    for it in alldata:
-        ym = f"{it['deal_year']}.{it['deal_month'].zfill(2)}"
-        all_months_set.add(ym)
-    all_months = sorted(all_months_set)
-
-    # 구별 전체 데이터
-    district_all = defaultdict(list)
-    for it in alldata:
-        key = f"{it['sido']}|{it['sigungu']}"
-        district_all[key].append(it)
+def deal_ymd(it):
+    """거래일 → YYYYMMDD 정수 (빈 칸은 0, index.html 에서 YYYY.MM.DD 로 표시)"""
+    y, m, d = (int(v) if v.isdigit() else 0
+               for v in (it['deal_year'], it['deal_month'], it['deal_day']))
+    return y * 10000 + m * 100 + d
+
+
+def build_district_data(agg):
+    """전국 구별 TOP 10 JSON 생성 (MonthlyAggregate 기반)"""
+    print("── 전국 구별 TOP 10 생성 ──")
+    all_months = agg.months
+    top10_map = agg.region_tops()
 
     result = {
         "updated": datetime.now().strftime('%Y.%m.%d %H:%M'),
-        "labels": all_months,
+        "labels": [ym_label(m) for m in all_months],
+        "fields": DISTRICT_FIELDS,
         "data": {}
     }
 
-    for key, t10 in top10_map.items():
-        all_items = district_all[key]
-
-        # 아파트별 월평균 평당가
-        apt_monthly = defaultdict(lambda: defaultdict(list))
-        for it in all_items:
-            ym = f"{it['deal_year']}.{it['deal_month'].zfill(2)}"
-            apt_monthly[it['apt_name']][ym].append(it['price_per_pyeong'])
-
-        series = []
-        for apt in t10:
-            vals = []
-            for m in all_months:
-                if m in apt_monthly[apt['apt_name']]:
-                    v = apt_monthly[apt['apt_name']][m]
-                    vals.append(round(sum(v) / len(v)))
-                else:
-                    vals.append(None)
-            series.append(vals)
-
-        # 6개월 거래 건수
-        deal_count = sum(
-            1 for it in all_items
-            if f"{it['deal_year']}{it['deal_month'].zfill(2)}" in months_6_set
-        )
-
-        avg_pp = round(sum(it['price_per_pyeong'] for it in t10) / len(t10))
+    for r, items in top10_map.items():
+        series = [encode_series(agg.series(r, it['apt_name'])) for it in items]
+        avg_pp = round(sum(it['price_per_pyeong'] for it in items) / len(items))
+        key = f"{items[0]['sido']}|{items[0]['sigungu']}"
 
         result["data"][key] = {
-            "top10": [{
-                "name": it['apt_name'],
-                "dong": it['dong'],
-                "area_m2": it['area_m2'],
-                "area_pyeong": it['area_pyeong'],
-                "price": it['price'],
-                "ppyeong": it['price_per_pyeong'],
-                "date": f"{it['deal_year']}.{it['deal_month'].zfill(2)}.{it['deal_day'].zfill(2)}",
-                "floor": it['floor'],
-                "build_year": it['build_year']
-            } for it in t10],
+            "top10": [[
+                it['apt_name'], it['dong'], it['area_m2'], it['area_pyeong'],
+                it['price'], it['price_per_pyeong'], deal_ymd(it),
+                it['floor'], it['build_year'],
+            ] for it in items],
             "series": series,
             "avg": avg_pp,
-            "deals": deal_count
+            "deals": agg.recent[r]
         }
 
     outpath = os.path.join(DATA_DIR, 'district_top10.json')
-    with open(outpath, 'w', encoding='utf-8') as f:
-        json.dump(result, f, ensure_ascii=False)
+    h = payload_hash({k: v for k, v in result.items() if k != 'updated'})
+    if payload_unchanged('district', h, [outpath] + district_shard_paths(result)):
+        print(f"  → {len(top10_map)}개 지역, 변경 없음 (기존 파일 유지)")
+        return top10_map
+
+    dump_json_artifact(outpath, result, separators=(',', ':'))
 
     fsize = os.path.getsize(outpath) / 1024
     print(f"  → {len(top10_map)}개 지역 → {outpath} ({fsize:.0f}KB)")
+    write_district_shards(result)
     return top10_map
 
 
+def district_shard_paths(result):
+    outdir = os.path.join(DATA_DIR, 'districts')
+    return [os.path.join(outdir, 'index.json')] + [
+        os.path.join(outdir, f"{REVERSE_REGION[tuple(key.split('|', 1))]}.json")
+        for key in result["data"]]
+
+
+def write_district_shards(result):
+    """
+    index.html 용 분할 출력 (data/districts/)
+      index.json   : 갱신 시각, 월 라벨, 구별 요약 (평균/거래 건수/1위 단지)
+      <지역코드>.json: 해당 구의 top10 + series
+    첫 화면은 index.json 만으로 그리고 구별 파일은 선택 시 불러온다
+    """
+    outdir = os.path.join(DATA_DIR, 'districts')
+    os.makedirs(outdir, exist_ok=True)
+
+    manifest = {"updated": result["updated"], "labels": result["labels"],
+                "fields": result["fields"], "districts": {}}
+    written = set()
+    for key, d in result["data"].items():
+        code = REVERSE_REGION[tuple(key.split('|', 1))]
+        manifest["districts"][key] = {
+            "code": code,
+            "avg": d["avg"],
+            "deals": d["deals"],
+            "top_name": d["top10"][0][0],
+        }
+        fname = f"{code}.json"
+        dump_json_artifact(os.path.join(outdir, fname),
+                           {"top10": d["top10"], "series": d["series"]}, separators=(',', ':'))
+        written.add(fname)
+
+    dump_json_artifact(os.path.join(outdir, 'index.json'), manifest, separators=(',', ':'))
+
+    # 더 이상 데이터가 없는 구의 파일 정리 (압축본 포함)
+    for fname in os.listdir(outdir):
+        if fname.endswith('.json') and fname != 'index.json' and fname not in written:
+            remove_artifact(os.path.join(outdir, fname))
+
+    msize = os.path.getsize(os.path.join(outdir, 'index.json')) / 1024
+    print(f"  → {outdir}/index.json ({msize:.0f}KB) + 구별 {len(written)}개 파일")
+
+
 # ════════════════════════════════════════
-# 대시보드 2: 서울 TOP 20
+# 대시보드 2: 지역 묶음별 TOP N (서울 TOP 20 등)
 # ════════════════════════════════════════
 
-def seoul_top20(data):
-    best = defaultdict(lambda: None)
-    for it in data:
-        k = (it['apt_name'], it['sido'], it['sigungu'])
-        if best[k] is None or it['price_per_pyeong'] > best[k]['price_per_pyeong']:
-            best[k] = it
-    return sorted(best.values(), key=lambda x: x['price_per_pyeong'], reverse=True)[:20]
-
-
-def seoul_monthly_avg(data, keys):
-    m = defaultdict(list)
-    for it in data:
-        k = (it['apt_name'], it['sido'], it['sigungu'])
-        if k in keys:
-            ym = f"{it['deal_year']}.{it['deal_month'].zfill(2)}"
-            m[ym].append(it['price_per_pyeong'])
-    return {ym: round(sum(v) / len(v)) for ym, v in sorted(m.items())}
-
-
-def seoul_per_apt_monthly(data, t20):
-    all_months = set()
-    apt_data = defaultdict(lambda: defaultdict(list))
-    keys = set((it['apt_name'], it['sido'], it['sigungu']) for it in t20)
-    for it in data:
-        k = (it['apt_name'], it['sido'], it['sigungu'])
-        if k in keys:
-            ym = f"{it['deal_year']}.{it['deal_month'].zfill(2)}"
-            all_months.add(ym)
-            apt_data[k][ym].append(it['price_per_pyeong'])
-    months = sorted(all_months)
-    result = []
-    for it in t20:
-        k = (it['apt_name'], it['sido'], it['sigungu'])
-        vals = []
-        for m in months:
-            if m in apt_data[k]:
-                vals.append(round(sum(apt_data[k][m]) / len(apt_data[k][m])))
-            else:
-                vals.append(None)
-        result.append({'name': it['apt_name'], 'values': vals})
-    return months, result
+def board_paths(name):
+    """순위표별 출력 경로 (서울은 기존 파일명 그대로)"""
+    if name == 'seoul':
+        return {
+            'top': os.path.join(DATA_DIR, 'top20.json'),
+            'history': os.path.join(DATA_DIR, 'history.json'),
+            'rank': os.path.join(DATA_DIR, 'previous_rank.json'),
+            'html': 'seoul.html',
+        }
+    outdir = os.path.join(DATA_DIR, 'leaderboards')
+    return {
+        'top': os.path.join(outdir, f'{name}_top.json'),
+        'history': os.path.join(outdir, f'{name}_history.json'),
+        'rank': os.path.join(outdir, f'{name}_previous_rank.json'),
+        'html': f'{name}.html',
+    }
+
+
+def board_monthly_avg(agg, keys):
+    return {ym_label(m): v for m, v in agg.pooled_avg(keys).items()}
 
 
-def seoul_region_dist(t20):
+def board_per_apt_monthly(agg, top):
+    keys = [(it['region_code'], it['apt_name']) for it in top]
+    months = agg.active_months(keys)
+    result = [{'name': a, 'values': agg.series(r, a, months)} for r, a in keys]
+    return [ym_label(m) for m in months], result
+
+
+def board_region_dist(top):
     d = defaultdict(int)
-    for it in t20:
+    for it in top:
         d[it['sigungu']] += 1
     return dict(sorted(d.items(), key=lambda x: x[1], reverse=True))
 
 
-def seoul_rank_changes(t20, f):
+def board_rank_changes(top, f):
     prev = {}
     if os.path.exists(f):
         with open(f, 'r', encoding='utf-8') as fp_:
             prev = json.load(fp_)
     ch = []
-    for i, it in enumerate(t20):
+    for i, it in enumerate(top):
         k = f"{it['apt_name']}|{it['sido']}|{it['sigungu']}"
         p = prev.get(k)
         ch.append('new' if p is None else p - (i + 1))
-    cur = {f"{it['apt_name']}|{it['sido']}|{it['sigungu']}": i + 1 for i, it in enumerate(t20)}
-    with open(f, 'w', encoding='utf-8') as fp_:
-        json.dump(cur, fp_, ensure_ascii=False)
+    cur = {f"{it['apt_name']}|{it['sido']}|{it['sigungu']}": i + 1 for i, it in enumerate(top)}
+    atomic_write(f, json.dumps(cur, ensure_ascii=False).encode('utf-8'))
     return ch
 
 
-def seoul_insights(t20, mavg):
+def board_insights(top, mavg):
     ms = sorted(mavg.keys())
-    avg = round(sum(it['price_per_pyeong'] for it in t20) / len(t20))
+    avg = round(sum(it['price_per_pyeong'] for it in top) / len(top))
     mom = 0
     if len(ms) >= 2:
         c, p = mavg[ms[-1]], mavg[ms[-2]]
         mom = round((c - p) / p * 100, 1) if p > 0 else 0
-    rd = seoul_region_dist(t20)
+    rd = board_region_dist(top)
     streak = 0
     direction = 'flat'
     if len(ms) >= 2:
@@ -569,53 +2279,66 @@ def seoul_insights(t20, mavg):
                 break
     return {
         'avg': avg, 'mom': mom,
-        'top_apt': t20[0]['apt_name'], 'top_apt_price': t20[0]['price_per_pyeong'],
+        'top_apt': top[0]['apt_name'], 'top_apt_price': top[0]['price_per_pyeong'],
         'top_region': list(rd.keys())[0], 'top_region_count': list(rd.values())[0],
         'streak': streak, 'direction': direction
     }
 
 
-def build_seoul_html(recent_seoul, alldata_seoul):
-    """서울 TOP 20 HTML 대시보드 생성"""
-    print("\n── 서울 TOP 20 생성 ──")
+def build_leaderboards(agg, boards=None):
+    """LEADERBOARDS 의 순위표를 모두 생성 (집계는 이미 끝났으므로 순위표별 비용은 TOP N 크기뿐)"""
+    for name, (title, _codes, _n) in (LEADERBOARDS if boards is None else boards).items():
+        with METRICS.span(f'leaderboard:{name}', rows_in=len(agg.boards[name])):
+            build_leaderboard_html(agg, name, title)
 
-    t20 = seoul_top20(recent_seoul)
-    if not t20:
-        print("  ⚠️ 서울 데이터 없음, 건너뜀")
+
+def build_leaderboard_html(agg, name, title):
+    """순위표 하나의 HTML 대시보드 생성 (MonthlyAggregate 기반)"""
+    top = agg.board(name)
+    print(f"\n── {title} TOP {agg.boards[name].k} 생성 ──")
+    if not top:
+        print(f"  ⚠️ {title} 데이터 없음, 건너뜀")
         return
 
-    keys = set((it['apt_name'], it['sido'], it['sigungu']) for it in t20)
-    mavg = seoul_monthly_avg(alldata_seoul, keys)
-    apt_months, apt_series = seoul_per_apt_monthly(alldata_seoul, t20)
-    rd = seoul_region_dist(t20)
-    rch = seoul_rank_changes(t20, os.path.join(DATA_DIR, 'previous_rank.json'))
-    ins = seoul_insights(t20, mavg)
+    paths = board_paths(name)
+    gkey = GOOGLE_MAPS_API_KEY
+    with METRICS.span('leaderboard_series', rows_in=len(top)):
+        keys = [(it['region_code'], it['apt_name']) for it in top]
+        mavg = board_monthly_avg(agg, keys)
+        apt_months, apt_series = board_per_apt_monthly(agg, top)
+
+    # TOP N 과 추이가 지난 실행과 같으면 순위 변동/HTML 생성을 모두 건너뜀
+    # (previous_rank 도 그대로 → 페이지는 마지막으로 바뀐 시점의 순위 변동을 유지)
+    outputs = [paths['top'], paths['history'], paths['html']]
+    h = payload_hash([title, top, mavg, apt_months, apt_series,
+                      hashlib.sha256(gkey.encode()).hexdigest(), load_template('leaderboard.html'),
+                      asset_url('leaderboard.css'), asset_url('leaderboard.js')])
+    if payload_unchanged(name, h, outputs):
+        print(f"  → 변경 없음 ({paths['html']} 유지)")
+        return
+
+    os.makedirs(os.path.dirname(paths['top']), exist_ok=True)
+    rd = board_region_dist(top)
+    rch = board_rank_changes(top, paths['rank'])
+    ins = board_insights(top, mavg)
 
     # JSON 저장
-    with open(os.path.join(DATA_DIR, 'top20.json'), 'w', encoding='utf-8') as f:
-        json.dump([it for it in t20], f, ensure_ascii=False, indent=2)
-    with open(os.path.join(DATA_DIR, 'history.json'), 'w', encoding='utf-8') as f:
-        json.dump(mavg, f, ensure_ascii=False, indent=2)
+    dump_json_artifact(paths['top'], [it for it in top], indent=2)
+    dump_json_artifact(paths['history'], mavg, indent=2)
 
     # HTML 생성
-    gkey = GOOGLE_MAPS_API_KEY
-    html = gen_seoul_html(t20, rch, mavg, rd, ins, gkey, apt_months, apt_series)
-    with open('seoul.html', 'w', encoding='utf-8') as f:
-        f.write(html)
-    print(f"  → seoul.html 생성 완료")
-    for i, it in enumerate(t20, 1):
+    with METRICS.span('gen_leaderboard_html', rows_in=len(top)) as sp:
+        html = gen_leaderboard_html(title, top, rch, mavg, rd, ins, gkey, apt_months, apt_series)
+        sp['bytes_out'] = len(html.encode('utf-8'))
+    write_artifact(paths['html'], html)
+    print(f"  → {paths['html']} 생성 완료")
+    for i, it in enumerate(top, 1):
         print(f"  {i}. {it['apt_name']} ({it['sido']} {it['sigungu']}) - {fp(it['price_per_pyeong'])}")
 
 
-def gen_seoul_html(t20, rch, mavg, rdist, ins, gkey, apt_months, apt_series):
+def gen_leaderboard_html(title, t20, rch, mavg, rdist, ins, gkey, apt_months, apt_series):
     ut = datetime.now().strftime('%Y.%m.%d %H:%M')
-    cl = json.dumps(list(mavg.keys()))
-    cv = json.dumps(list(mavg.values()))
-    dl = json.dumps(list(rdist.keys()))
-    dv = json.dumps(list(rdist.values()))
     colors = ['#00d4aa','#4ecdc4','#ff6b6b','#45b7d1','#96ceb4','#ffeaa7','#dfe6e9','#a29bfe','#fd79a8','#e17055','#00b894','#6c5ce7','#fdcb6e','#e84393','#636e72','#fab1a0','#74b9ff','#55efc4','#b2bec3','#ff7675']
-    dc = json.dumps(colors[:len(rdist)])
-    af = fp(ins['avg'])
     mom = ins['mom']
     ms = '▲' if mom > 0 else ('▼' if mom < 0 else '─')
     mc = '#00d4aa' if mom > 0 else ('#ff4757' if mom < 0 else '#888')
@@ -637,21 +2360,29 @@ def gen_seoul_html(t20, rch, mavg, rdist, ins, gkey, apt_months, apt_series):
             tp.append(f"❄️ 최대 하락: {t20[bd[0]]['apt_name']} ({bd[1]}위)")
     th = ' · '.join(tp) if tp else '📊 순위 변동 데이터 수집 중...'
 
-    # Per-apartment chart data
-    apt_labels = json.dumps(apt_months)
-    apt_datasets_js = "["
-    for i, s in enumerate(apt_series):
-        c = colors[i % len(colors)]
-        vals = json.dumps(s['values'])
-        apt_datasets_js += f"""{{
-            label:'{s['name']}',data:{vals},borderColor:'{c}',
-            backgroundColor:'transparent',tension:0.3,
-            pointRadius:0,pointHoverRadius:4,borderWidth:1.5,
-            spanGaps:true
-        }},"""
-    apt_datasets_js += "]"
-
-    rows = ""
+    cards = {
+        'title': title,
+        'n': str(len(t20)),
+        'avg': fp(ins['avg']),
+        'mom_color': mc,
+        'mom': f"{ms} {abs(mom)}%",
+        'top_apt': ins['top_apt'],
+        'top_apt_price': fp(ins['top_apt_price']),
+        'top_region': ins['top_region'],
+        'top_region_count': str(ins['top_region_count']),
+    }
+
+    # 차트 데이터는 JSON 하나로 (페이지 스크립트 assets/leaderboard.js 가 읽음)
+    data = {
+        'aptLabels': apt_months,
+        'aptDatasets': [{'label': s['name'], 'data': s['values']} for s in apt_series],
+        'avgLabels': list(mavg.keys()),
+        'avgValues': list(mavg.values()),
+        'colors': [colors[i % len(colors)] for i in range(len(t20))],
+    }
+    blob = json.dumps(data, ensure_ascii=False).replace('</', '<\\/')
+
+    rows = []
     for i, it in enumerate(t20):
         rc = rch[i]
         if rc == 'new':
@@ -662,279 +2393,602 @@ def gen_seoul_html(t20, rch, mavg, rdist, ins, gkey, apt_months, apt_series):
             ch = f'<span style="color:#ff4757;">▼{abs(rc)}</span>'
         else:
             ch = '<span style="color:#888;">─</span>'
-        dd = f"{it['deal_year']}.{it['deal_month'].zfill(2)}.{it['deal_day'].zfill(2)}"
-        loc = f"{it['sido']} {it['sigungu']}"
-        mq = f"{it['apt_name']}+{it['sido']}+{it['sigungu']}+{it['dong']}"
-        c = colors[i % len(colors)]
-        rows += f'''
+        rows.append(LEADERBOARD_ROW.format(
+            i=i, n=i + 1, ch=ch, c=colors[i % len(colors)], it=it,
+            loc=f"{it['sido']} {it['sigungu']}",
+            ppy=fp(it['price_per_pyeong']), price=fb(it['price']),
+            dd=f"{it['deal_year']}.{it['deal_month'].zfill(2)}.{it['deal_day'].zfill(2)}",
+            gkey=gkey, mq=f"{it['apt_name']}+{it['sido']}+{it['sigungu']}+{it['dong']}"))
+
+    return render_template('leaderboard.html', cards, trend=th, rows=''.join(rows), updated=ut,
+                           data=blob, css=asset_url('leaderboard.css'),
+                           js=asset_url('leaderboard.js'))
+
+
+# 순위표의 한 단지 (본 행 + 펼침 상세 행)
+LEADERBOARD_ROW = '''
         <tr class="main-row" data-idx="{i}" onclick="handleRowClick({i})">
-            <td class="rank-cell">{i+1}</td><td class="change-cell">{ch}</td>
-            <td class="apt-name"><span class="color-dot" style="background:{c};"></span>{it['apt_name']} <span class="arrow" id="arrow-{i+1}">▼</span></td>
-            <td class="loc-cell">{loc}</td><td class="price">{fp(it['price_per_pyeong'])}</td>
+            <td class="rank-cell">{n}</td><td class="change-cell">{ch}</td>
+            <td class="apt-name"><span class="color-dot" style="background:{c};"></span>{it[apt_name]} <span class="arrow" id="arrow-{n}">▼</span></td>
+            <td class="loc-cell">{loc}</td><td class="price">{ppy}</td>
         </tr>
-        <tr class="detail-row" id="detail-{i+1}"><td colspan="5"><div class="detail-content">
+        <tr class="detail-row" id="detail-{n}"><td colspan="5"><div class="detail-content">
             <div class="detail-info"><table class="detail-table">
-                <tr><th>동</th><td>{it['dong']}</td></tr>
-                <tr><th>전용면적</th><td>{it['area_m2']}㎡ ({it['area_pyeong']}평)</td></tr>
-                <tr><th>거래금액</th><td>{fb(it['price'])}</td></tr>
+                <tr><th>동</th><td>{it[dong]}</td></tr>
+                <tr><th>전용면적</th><td>{it[area_m2]}㎡ ({it[area_pyeong]}평)</td></tr>
+                <tr><th>거래금액</th><td>{price}</td></tr>
                 <tr><th>거래일</th><td>{dd}</td></tr>
-                <tr><th>층</th><td>{it['floor']}층</td></tr>
-                <tr><th>건축년도</th><td>{it['build_year']}년</td></tr>
+                <tr><th>층</th><td>{it[floor]}층</td></tr>
+                <tr><th>건축년도</th><td>{it[build_year]}년</td></tr>
             </table></div>
             <div class="detail-map"><iframe width="300" height="200" style="border:0;border-radius:8px;" loading="lazy" allowfullscreen referrerpolicy="no-referrer-when-downgrade" src="https://www.google.com/maps/embed/v1/place?key={gkey}&q={mq}&zoom=15"></iframe></div>
         </div></td></tr>'''
 
-    return f'''<!DOCTYPE html>
-<html lang="ko">
-<head>
-<meta charset="UTF-8"><meta name="viewport" content="width=device-width,initial-scale=1.0">
-<title>서울 아파트 평당가 TOP 20</title>
-<link href="https://fonts.googleapis.com/css2?family=Noto+Sans+KR:wght@400;500;700&display=swap" rel="stylesheet">
-<script src="https://cdnjs.cloudflare.com/ajax/libs/Chart.js/4.4.1/chart.umd.min.js"></script>
-<style>
-*{{margin:0;padding:0;box-sizing:border-box}}
-body{{font-family:'Noto Sans KR',sans-serif;background:#000;color:#fff;min-height:100vh;padding:40px 20px}}
-.container{{max-width:1200px;margin:0 auto}}
-h1{{font-size:2rem;font-weight:700;margin-bottom:8px;letter-spacing:-0.5px}}
-.subtitle{{color:#888;font-size:0.9rem;margin-bottom:24px}}
-.insight-cards{{display:grid;grid-template-columns:repeat(4,1fr);gap:12px;margin-bottom:20px}}
-.insight-card{{background:#1a1a1a;border-radius:12px;padding:20px}}
-.insight-card .label{{color:#888;font-size:0.8rem;margin-bottom:8px}}
-.insight-card .value{{font-size:1.3rem;font-weight:700}}
-.insight-card .sub{{font-size:0.85rem;margin-top:4px;color:#888}}
-.chart-section{{background:#1a1a1a;border-radius:12px;padding:24px;margin-bottom:20px}}
-.chart-header{{display:flex;justify-content:space-between;align-items:center;margin-bottom:16px;flex-wrap:wrap;gap:10px}}
-.chart-title{{font-size:1rem;font-weight:700}}
-.chart-hint{{font-size:0.8rem;color:#555;margin-top:8px;text-align:center}}
-.toggle-btns{{display:flex;gap:4px}}
-.toggle-btn{{background:#333;border:none;color:#aaa;padding:6px 14px;border-radius:8px;cursor:pointer;font-size:0.8rem;font-family:inherit;transition:all 0.2s}}
-.toggle-btn.active{{background:#00d4aa;color:#000}}
-.chart-canvas-wrap{{width:100%;height:200px;position:relative}}
-.chart-canvas-wrap canvas{{width:100%!important;height:100%!important}}
-.selected-label{{position:absolute;top:8px;left:12px;font-size:0.9rem;font-weight:700;color:#00d4aa;opacity:0;transition:opacity 0.3s;pointer-events:none}}
-.selected-label.show{{opacity:1}}
-.trend-bar{{background:#1a1a1a;border-radius:12px;padding:16px 20px;margin-bottom:20px;font-size:0.9rem;color:#aaa}}
-table.main-table{{width:100%;border-collapse:collapse}}
-table.main-table thead th{{text-align:left;padding:14px 10px;border-bottom:2px solid #333;font-weight:500;color:#aaa;font-size:0.82rem}}
-table.main-table thead th:last-child{{text-align:right}}
-.main-row{{cursor:pointer;transition:background 0.25s,opacity 0.25s}}
-.main-row:hover{{background:#1a1a1a}}
-.main-row td{{padding:16px 10px;border-bottom:1px solid #222;font-size:0.95rem}}
-.main-row.active-row{{background:rgba(0,212,170,0.08)}}
-.main-row.dimmed{{opacity:0.35}}
-.color-dot{{display:inline-block;width:10px;height:10px;border-radius:50%;margin-right:8px;vertical-align:middle}}
-.rank-cell{{font-weight:700;color:#666;width:40px}}
-.change-cell{{width:50px;font-size:0.85rem}}
-.apt-name{{font-weight:500}}
-.loc-cell{{color:#aaa}}
-.arrow{{color:#555;font-size:0.7rem;margin-left:6px;transition:transform 0.2s;display:inline-block}}
-.arrow.open{{transform:rotate(180deg)}}
-.price{{text-align:right;font-weight:700;color:#00d4aa;font-variant-numeric:tabular-nums}}
-.detail-row{{display:none}}
-.detail-row.show{{display:table-row}}
-.detail-row td{{padding:0;background:#0d0d0d;border-bottom:1px solid #222}}
-.detail-content{{padding:20px 10px 20px 50px;display:flex;gap:30px;align-items:flex-start}}
-.detail-info{{flex:1}}
-.detail-map{{flex-shrink:0}}
-.detail-table{{width:100%;max-width:350px}}
-.detail-table th{{text-align:left;padding:7px 16px 7px 0;color:#666;font-weight:400;font-size:0.88rem;width:90px}}
-.detail-table td{{padding:7px 0;font-size:0.93rem;color:#ccc}}
-.footer{{margin-top:40px;padding-top:20px;border-top:1px solid #222;color:#555;font-size:0.8rem;text-align:center}}
-@media(max-width:1024px){{.insight-cards{{grid-template-columns:repeat(2,1fr)}}}}
-@media(max-width:600px){{body{{padding:20px 12px}}h1{{font-size:1.4rem}}.insight-cards{{grid-template-columns:1fr 1fr}}.chart-canvas-wrap{{height:180px}}.detail-content{{flex-direction:column;padding:15px 8px 15px 20px;gap:16px}}.detail-map iframe{{width:100%;max-width:300px}}.main-row td{{padding:12px 6px;font-size:0.88rem}}}}
-</style>
-</head>
-<body>
-<div class="container">
-<h1>서울 아파트 평당가 TOP 20 <span style="font-weight:400;font-size:1rem;color:#888;">(전용면적 기준)</span></h1>
-<p class="subtitle">최근 6개월 실거래 기준 · 단지별 최고가</p>
-
-<div class="insight-cards">
-<div class="insight-card"><div class="label">TOP 20 평균 평당가</div><div class="value">{af}</div></div>
-<div class="insight-card"><div class="label">전월 대비</div><div class="value" style="color:{mc};">{ms} {abs(mom)}%</div></div>
-<div class="insight-card"><div class="label">최고가 단지</div><div class="value" style="font-size:1.1rem;">{ins['top_apt']}</div><div class="sub">{fp(ins['top_apt_price'])}</div></div>
-<div class="insight-card"><div class="label">최다 지역</div><div class="value" style="font-size:1.1rem;">{ins['top_region']}</div><div class="sub">TOP 20 중 {ins['top_region_count']}개</div></div>
-</div>
-
-<div class="chart-section" id="chartSection">
-<div class="chart-header">
-<span class="chart-title">📈 아파트별 평당가 추이</span>
-<div class="toggle-btns">
-<button class="toggle-btn" onclick="setRange(12)" id="btn-1y">1년</button>
-<button class="toggle-btn" onclick="setRange(24)" id="btn-2y">2년</button>
-<button class="toggle-btn active" onclick="setRange(36)" id="btn-3y">3년</button>
-</div>
-</div>
-<div class="chart-canvas-wrap">
-<div class="selected-label" id="selectedLabel"></div>
-<canvas id="trendChart"></canvas>
-</div>
-<div class="chart-hint">👆 아래 리스트에서 아파트를 클릭하면 해당 추이가 강조됩니다</div>
-</div>
-
-<div class="trend-bar">{th}</div>
-
-<table class="main-table">
-<thead><tr><th>순위</th><th></th><th>단지명</th><th>지역</th><th style="text-align:right;">평당가</th></tr></thead>
-<tbody>{rows}</tbody>
-</table>
-
-<div class="footer">마지막 업데이트: {ut} · 데이터 출처: 국토교통부 실거래가 공개시스템</div>
-</div>
-
-<script>
-const aptLabels = {apt_labels};
-const aptDatasets = {apt_datasets_js};
-const avgLabels = {cl};
-const avgValues = {cv};
-
-const COLORS = {json.dumps(colors[:20])};
-
-/* ── Chart.js: 아파트별 추이 ── */
-const ctx = document.getElementById('trendChart').getContext('2d');
-const datasets = aptDatasets.map((d, i) => ({{
-    ...d,
-    borderColor: COLORS[i],
-    borderWidth: 1.5,
-    pointRadius: 0,
-    pointHoverRadius: 4,
-    backgroundColor: 'transparent',
-    tension: 0.3,
-    spanGaps: true,
-    _origColor: COLORS[i]
-}}));
-
-const tc = new Chart(ctx, {{
-    type: 'line',
-    data: {{ labels: aptLabels, datasets: datasets }},
-    options: {{
-        responsive: true, maintainAspectRatio: false,
-        interaction: {{ mode: 'index', intersect: false }},
-        plugins: {{
-            legend: {{ display: false }},
-            tooltip: {{
-                backgroundColor: '#1a1a1a', titleColor: '#fff',
-                bodyColor: '#ccc', borderColor: '#333', borderWidth: 1,
-                filter: function(item) {{ return item.raw !== null; }},
-                callbacks: {{
-                    label: function(c) {{
-                        if (c.raw === null) return null;
-                        const v = c.raw;
-                        const b = Math.floor(v / 10000);
-                        const r = v % 10000;
-                        const p = b > 0 ? b + '억 ' + r.toLocaleString() + '만' : v.toLocaleString() + '만';
-                        return c.dataset.label + ': ' + p;
-                    }}
-                }}
-            }}
-        }},
-        scales: {{
-            x: {{ ticks: {{ color: '#666', maxRotation: 45, maxTicksLimit: 12 }}, grid: {{ color: '#222' }} }},
-            y: {{
-                ticks: {{
-                    color: '#666',
-                    callback: function(v) {{
-                        const b = Math.floor(v / 10000);
-                        return b > 0 ? b + '억' : v.toLocaleString() + '만';
-                    }}
-                }},
-                grid: {{ color: '#222' }}
-            }}
-        }}
-    }}
-}});
-
-/* ── 기간 토글 ── */
-function setRange(m) {{
-    document.querySelectorAll('.toggle-btn').forEach(b => b.classList.remove('active'));
-    document.getElementById(m === 12 ? 'btn-1y' : m === 24 ? 'btn-2y' : 'btn-3y').classList.add('active');
-    tc.data.labels = aptLabels.slice(-m);
-    tc.data.datasets.forEach((ds, i) => {{
-        ds.data = aptDatasets[i].data.slice(-m);
-    }});
-    tc.update();
-}}
-
-/* ── 클릭 인터랙션: 리스트 → 차트 하이라이트 ── */
-let activeIdx = -1;
-
-function highlightChart(idx) {{
-    const label = document.getElementById('selectedLabel');
-    tc.data.datasets.forEach((ds, i) => {{
-        if (i === idx) {{
-            ds.borderWidth = 3.5;
-            ds.borderColor = ds._origColor;
-            ds.pointRadius = 3;
-            ds.pointBackgroundColor = ds._origColor;
-        }} else {{
-            ds.borderWidth = 1;
-            ds.borderColor = ds._origColor + '1A';
-            ds.pointRadius = 0;
-        }}
-    }});
-    label.textContent = aptDatasets[idx].label;
-    label.style.color = COLORS[idx];
-    label.classList.add('show');
-    tc.update();
-}}
-
-function resetChart() {{
-    const label = document.getElementById('selectedLabel');
-    tc.data.datasets.forEach((ds) => {{
-        ds.borderWidth = 1.5;
-        ds.borderColor = ds._origColor;
-        ds.pointRadius = 0;
-    }});
-    label.classList.remove('show');
-    tc.update();
-}}
-
-function highlightRows(idx) {{
-    document.querySelectorAll('.main-row').forEach((row, i) => {{
-        if (i === idx) {{
-            row.classList.add('active-row');
-            row.classList.remove('dimmed');
-        }} else {{
-            row.classList.remove('active-row');
-            row.classList.add('dimmed');
-        }}
-    }});
-}}
-
-function resetRows() {{
-    document.querySelectorAll('.main-row').forEach(row => {{
-        row.classList.remove('active-row', 'dimmed');
-    }});
-}}
-
-function handleRowClick(idx) {{
-    if (activeIdx === idx) {{
-        activeIdx = -1;
-        resetChart();
-        resetRows();
-    }} else {{
-        activeIdx = idx;
-        highlightChart(idx);
-        highlightRows(idx);
-        document.getElementById('chartSection').scrollIntoView({{ behavior: 'smooth', block: 'nearest' }});
-    }}
-    toggleDetail(idx + 1);
-}}
-
-function toggleDetail(id) {{
-    document.getElementById('detail-' + id).classList.toggle('show');
-    document.getElementById('arrow-' + id).classList.toggle('open');
-}}
-</script>
-</body>
-</html>'''
+
+@lru_cache(maxsize=None)
+def load_template(name):
+    """
+    templates/<name> 를 한 번만 읽어 [문자열, 슬롯명, 문자열, 슬롯명, ..., 문자열] 로 분해
+    슬롯 표기는 {{이름}}
+    """
+    with open(os.path.join(TEMPLATE_DIR, name), encoding='utf-8') as f:
+        return tuple(re.split(r'\{\{(\w+)\}\}', f.read()))
+
+
+def render_template(name, values=None, **kw):
+    """슬롯을 채워 문자열 조각 리스트를 한 번에 join (템플릿 크기 + 값 크기에 선형)"""
+    values = dict(values or {}, **kw)
+    parts = load_template(name)
+    out = []
+    for i, part in enumerate(parts):
+        out.append(values[part] if i % 2 else part)
+    return ''.join(out)
+
+
+@lru_cache(maxsize=None)
+def asset_url(name):
+    """assets/<name>?v=<내용 해시> (파일이 바뀔 때만 브라우저가 새로 받음)"""
+    path = os.path.join(ASSET_DIR, name)
+    with open(path, 'rb') as f:
+        h = hashlib.sha256(f.read()).hexdigest()[:ARTIFACT_HASH_LEN]
+    return f"{path.replace(os.sep, '/')}?v={h}"
+
+
+# ════════════════════════════════════════
+# 정적 산출물 (압축본 + 해시 매니페스트)
+# ════════════════════════════════════════
+
+def atomic_write(path, data):
+    """임시 파일에 쓴 뒤 rename → 중간에 실패해도 반쯤 쓴 파일이 남지 않음"""
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def write_if_changed(path, data):
+    """내용이 같으면 파일을 건드리지 않음 → True 면 새로 씀"""
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    atomic_write(path, data)
+    return True
+
+
+def write_artifact(path, text):
+    """정적 산출물 저장 (원자적, 내용이 같으면 생략) + ARTIFACTS 에 기록"""
+    write_if_changed(path, text.encode('utf-8'))
+    ARTIFACTS.append(path)
+
+
+def dump_json_artifact(path, obj, **kw):
+    write_artifact(path, json.dumps(obj, ensure_ascii=False, **kw))
+
+
+def payload_hash(obj):
+    """출력 내용의 의미 해시 (키 순서와 무관, 생성 시각 등은 호출 측에서 제외)"""
+    data = json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()[:ARTIFACT_HASH_LEN]
+
+
+def load_payload_hashes():
+    """지난 실행의 data/manifest.json 에서 출력별 의미 해시를 읽어 PAYLOAD_HASHES 로"""
+    PAYLOAD_HASHES.clear()
+    try:
+        with open(os.path.join(DATA_DIR, 'manifest.json'), encoding='utf-8') as f:
+            PAYLOAD_HASHES.update(json.load(f).get('payloads', {}))
+    except (OSError, ValueError):
+        pass
+
+
+def previous_artifacts():
+    """지난 실행 data/manifest.json 에 기록된 산출물 중 아직 남아 있는 경로"""
+    try:
+        with open(os.path.join(DATA_DIR, 'manifest.json'), encoding='utf-8') as f:
+            files = json.load(f).get('files', {})
+    except (OSError, ValueError):
+        return []
+    return [p for p in (k.replace('/', os.sep) for k in files) if os.path.exists(p)]
+
+
+def payload_unchanged(name, h, paths):
+    """
+    지난 실행과 의미 해시가 같고 산출물이 모두 남아 있으면 True
+    (이 경우 기존 파일을 그대로 ARTIFACTS 에 기록하고 다시 쓰지 않는다)
+    """
+    prev = PAYLOAD_HASHES.get(name)
+    PAYLOAD_HASHES[name] = h
+    if prev != h or not all(os.path.exists(p) for p in paths):
+        return False
+    ARTIFACTS.extend(paths)
+    return True
+
+
+def compress_artifact(path):
+    """
+    path.gz (+ brotli 가 있으면 path.br) 생성
+    gzip 헤더의 파일명/시각을 비워 같은 입력이면 항상 같은 바이트 → git diff 가 조용함
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    buf = io.BytesIO()
+    with gzip.GzipFile(filename='', mode='wb', fileobj=buf, compresslevel=9, mtime=0) as gz:
+        gz.write(raw)
+    out = {'bytes': len(raw), 'gz': len(buf.getvalue())}
+    write_if_changed(path + '.gz', buf.getvalue())
+    if brotli is not None:
+        br = brotli.compress(raw, quality=11)
+        out['br'] = len(br)
+        write_if_changed(path + '.br', br)
+    out['hash'] = hashlib.sha256(raw).hexdigest()[:ARTIFACT_HASH_LEN]
+    return out
+
+
+def remove_artifact(path):
+    """산출물과 압축본 삭제 (더 이상 생성되지 않는 파일 정리용)"""
+    for p in (path, path + '.gz', path + '.br'):
+        if os.path.exists(p):
+            os.remove(p)
+
+
+def write_manifest(paths):
+    """
+    산출물마다 압축본을 만들고 data/manifest.json 에 내용 해시를 기록
+      {"files": {"data/districts/index.json": {"hash", "bytes", "gz"[, "br"]}, ...},
+       "payloads": {"district": 의미 해시, "seoul": 의미 해시, ...}}
+    프런트엔드는 url?v=<hash> 로 요청해 내용이 바뀔 때만 새로 받는다
+    """
+    files = {}
+    for path in sorted(set(paths)):
+        files[path.replace(os.sep, '/')] = compress_artifact(path)
+    manifest_path = os.path.join(DATA_DIR, 'manifest.json')
+    data = json.dumps({'files': files, 'payloads': PAYLOAD_HASHES},
+                      ensure_ascii=False, indent=1, sort_keys=True)
+    write_if_changed(manifest_path, data.encode('utf-8'))
+
+    raw = sum(v['bytes'] for v in files.values())
+    gz = sum(v['gz'] for v in files.values())
+    br = sum(v.get('br', 0) for v in files.values())
+    line = f"  → 압축본 {len(files)}개: {raw / 1024:.0f}KB → gzip {gz / 1024:.0f}KB"
+    if brotli is not None:
+        line += f" / brotli {br / 1024:.0f}KB"
+    print(line + f" ({manifest_path})")
+    return files
+
+
+# ════════════════════════════════════════
+# 실행 계측
+# ════════════════════════════════════════
+
+class RunMetrics:
+    """
+    단계별 실행 계측 (소요 시간, 입출력 건수, 캐시 적중, 메모리)
+
+        with METRICS.span('aggregate', rows_in=n) as sp:
+            ...
+            sp['rows_out'] = m
+
+    span() 은 데코레이터로도 쓸 수 있다 (@METRICS.span('name')).
+    trace_malloc=True 면 tracemalloc 최대치(peak_mb)를 스팬별로 기록한다.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self.stack = []
+        self.trace_malloc = False
+        self.t0 = time.perf_counter()
+        self.started = datetime.now()
+
+    def reset(self, trace_malloc=False):
+        self.__init__()
+        self.trace_malloc = trace_malloc
+        if trace_malloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _peak(self):
+        return tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+
+    @contextmanager
+    def span(self, name, **attrs):
+        sp = {'name': name, 'depth': len(self.stack), **attrs}
+        if self.stack:
+            # 자식 스팬이 peak 를 리셋하기 전 부모 구간 최대치 보존
+            parent = self.stack[-1]
+            parent['_peak'] = max(parent['_peak'], self._peak())
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        sp['_peak'] = 0
+        self.stack.append(sp)
+        start = time.perf_counter()
+        try:
+            yield sp
+        finally:
+            end = time.perf_counter()
+            self.stack.pop()
+            peak = max(sp.pop('_peak'), self._peak())
+            sp['start_ms'] = round((start - self.t0) * 1e3, 2)
+            sp['duration_ms'] = round((end - start) * 1e3, 2)
+            if self.trace_malloc:
+                sp['peak_mb'] = round(peak / 1e6, 2)
+            if self.stack:
+                parent = self.stack[-1]
+                parent['_peak'] = max(parent['_peak'], peak)
+            self.spans.append(sp)
+
+    def summary(self, **extra):
+        spans = sorted(self.spans, key=lambda sp: sp['start_ms'])
+        return {
+            'started': self.started.strftime('%Y-%m-%d %H:%M:%S'),
+            'total_ms': round((time.perf_counter() - self.t0) * 1e3, 2),
+            'max_rss_mb': round(max_rss_mb(), 1),
+            **extra,
+            'spans': spans,
+        }
+
+    def save(self, path=RUN_METRICS_PATH, **extra):
+        """path 의 실행 이력에 이번 실행을 추가 (최근 RUN_METRICS_KEEP 개 유지)"""
+        runs = []
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    runs = json.load(f).get('runs', [])
+            except (ValueError, OSError):
+                runs = []
+        runs.append(self.summary(**extra))
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'runs': runs[-RUN_METRICS_KEEP:]}, f, ensure_ascii=False, indent=1)
+
+    def save_trace(self, path):
+        """Chrome trace-event 형식 (chrome://tracing, Perfetto 에서 열기)"""
+        events = [{
+            'name': sp['name'], 'ph': 'X', 'pid': 1, 'tid': 1,
+            'ts': round(sp['start_ms'] * 1e3), 'dur': round(sp['duration_ms'] * 1e3),
+            'args': {k: v for k, v in sp.items()
+                     if k not in ('name', 'start_ms', 'duration_ms', 'depth')},
+        } for sp in self.spans]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+
+
+def max_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1e6 if sys.platform == 'darwin' else rss / 1e3
+
+
+METRICS = RunMetrics()
+
+
+# ════════════════════════════════════════
+# 감시 모드 (--watch)
+# ════════════════════════════════════════
+
+WATCH_INTERVAL = 0.25  # data/csv/ 폴링 간격 (초)
+
+
+def csv_snapshot():
+    """data/csv/*.csv → {경로: (크기, mtime_ns)}"""
+    snap = {}
+    for path in glob.glob(os.path.join(CSV_DIR, '*.csv')):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        snap[path] = (st.st_size, st.st_mtime_ns)
+    return snap
+
+
+class WarmState:
+    """
+    --watch 상주 상태: 파일별 레코드, 중복 제거된 TxTable, DedupIndex, MonthlyAggregate
+
+    새 CSV 의 이름이 기존 파일들보다 뒤에 오면 (국토부 파일명은 내려받은 시각) 그 파일의
+    새 거래만 집계에 더한다 — 콜드 실행과 처리 순서가 같으므로 결과도 같다.
+    교체 / 삭제 / 중간 삽입, 최근 6개월 경계가 넘어간 경우, 저장소에서 합친 과거 달에
+    거래가 들어온 경우는 메모리의 파일별 레코드로 집계를 다시 만든다 (바뀐 파일만 다시 파싱).
+    산출물은 의미 해시가 같으면 다시 쓰지 않으므로 영향받은 구 / 순위표 파일만 바뀐다.
+    """
+
+    def __init__(self, args, boards, spec):
+        self.args = args
+        self.boards = boards
+        self.spec = spec
+        self.snap = {}
+        self.records = {}        # 경로 → 레코드 튜플 리스트
+        self.table = None
+        self.dedup = None
+        self.agg = None
+        self.csv_months = set()  # CSV 거래로 만든 달 (저장소에서 합친 달과 구분)
+        self.store_months = set()  # 저장소에 아직 반영하지 않은 달 (flush_store)
+
+    def load(self):
+        """최초 로드 (파싱 캐시 + 병렬 파싱 사용)"""
+        self.snap = csv_snapshot()
+        for path, rows, _cached, _sha1 in iter_csv_batches(self.args.rebuild_cache,
+                                                           self.args.workers, self.spec):
+            self.records[path] = rows
+        self.rebuild()
+
+    def rebuild(self):
+        """파일별 레코드 → 중복 제거 → 집계를 처음부터 (파일명 순서)"""
+        months_6 = {int(m) for m in get_months(6)}
+        self.dedup = DedupIndex(verify=self.args.verify_dedup)
+        self.table = TxTable()
+        for path in sorted(self.records):
+            for row in self.records[path]:
+                if self.dedup.add(row):
+                    self.table.append(row)
+        self.agg = MonthlyAggregate(
+            months_6, DISTRICT_TOP_N,
+            {name: (codes, n) for name, (_t, codes, n) in self.boards.items()},
+            backend=self.args.backend).feed_table(self.table)
+        self.csv_months = set(self.agg.months)
+        self.store_months = set()
+        update_store(self.agg, self.args)
+
+    def can_fold(self, paths):
+        """paths 를 기존 상태에 더하기만 해도 콜드 실행과 같은 결과가 나오는지"""
+        if self.agg is None or {int(m) for m in get_months(6)} != self.agg.recent_months:
+            return False
+        old = [p for p in self.records if p not in paths]
+        if old and min(paths) < max(old):
+            return False
+        months = {ym_code(r[8], r[9]) for p in paths for r in self.records[p]}
+        if months & (set(self.agg.months) - self.csv_months):
+            return False
+        # 마지막 달이 늘면 저장소 이력 구간(--history-months)도 밀리므로 다시 만듦
+        return not (self.args.history_months > 0 and months and max(months) > max(self.agg.months))
+
+    def fold(self, paths):
+        """새 파일의 새 거래만 집계에 반영 → 거래가 들어온 달 집합"""
+        table, agg = self.table, self.agg
+        start = len(table)
+        for path in sorted(paths):
+            for row in self.records[path]:
+                if self.dedup.add(row):
+                    table.append(row)
+        regions, apts = table.region_pool.values, table.apt_pool.values
+        months = set()
+        for i in range(start, len(table)):
+            agg.add(regions[table.region[i]], apts[table.apt[i]], table.ym[i], table.ppy[i], i)
+            months.add(table.ym[i])
+        agg.record = table.record
+        agg._finish()
+        self.csv_months |= months
+        self.store_months |= months
+        return months
+
+    def flush_store(self):
+        """fold() 로 바뀐 달을 월별 집계 저장소에 반영 (산출물 생성 뒤로 미룸)"""
+        if self.store_months:
+            update_store(self.agg, self.args, self.store_months, load=False)
+            self.store_months = set()
+
+    def update(self, snap):
+        """스냅샷 차이 반영 → 결과 요약 문자열 (바뀐 내용이 없으면 None)"""
+        added = sorted(p for p in snap if p not in self.snap)
+        changed = sorted(p for p in snap if p in self.snap and snap[p] != self.snap[p])
+        removed = sorted(p for p in self.snap if p not in snap)
+        self.snap = snap
+
+        with METRICS.span('watch_parse', files=len(added) + len(changed)):
+            for path in added + changed:
+                rows = read_csv_rows(path, spec=self.spec)
+                if path in changed and rows == self.records.get(path):
+                    changed.remove(path)  # mtime 만 바뀜
+                self.records[path] = rows
+        for path in removed:
+            del self.records[path]
+        if not (added or changed or removed):
+            return None
+
+        if added and not (changed or removed) and self.can_fold(added):
+            with METRICS.span('watch_fold', rows_in=sum(len(self.records[p]) for p in added)) as sp:
+                months = self.fold(added)
+                sp['months'] = sorted(months)
+            how = f"새 거래 반영 ({len(months)}개월)"
+        else:
+            with METRICS.span('watch_rebuild', rows_in=sum(map(len, self.records.values()))):
+                self.rebuild()
+            how = "전체 재집계"
+        names = ', '.join(os.path.basename(p) for p in added + changed + removed)
+        return f"{names}: {how}"
+
+    def publish(self):
+        """산출물 생성 (의미 해시가 같은 출력은 건너뜀)"""
+        build_outputs(self.agg, self.boards, self.args.only)
+
+
+def watch(args, boards, spec, interval=WATCH_INTERVAL):
+    """
+    data/csv/ 를 폴링하며 파일이 추가 / 교체 / 삭제되면 WarmState 로 산출물 갱신
+    복사 중인 파일을 읽지 않도록 mtime 이 한 폴링 간격보다 오래된 뒤에 반영한다
+    (--fetch 처럼 rename 으로 나타나는 파일은 보통 다음 폴링에 바로 반영).
+    """
+    state = WarmState(args, boards, spec)
+    with METRICS.span('load'):
+        state.load()
+    print("Step 2: 대시보드 생성\n")
+    state.publish()
+    METRICS.save(rows=len(state.table), watch='start')
+    print(f"\n👀 {CSV_DIR}/ 감시 중 ({interval}초 간격, Ctrl+C 로 종료)\n")
+
+    try:
+        while True:
+            time.sleep(interval)
+            snap = csv_snapshot()
+            if snap == state.snap:
+                continue
+            # 마지막 수정이 한 폴링 간격 이내인 파일은 아직 쓰는 중일 수 있으므로 다음 폴링에
+            now = time.time_ns()
+            if any(now - snap[p][1] < interval * 1e9
+                   for p in snap if snap[p] != state.snap.get(p)):
+                continue
+            METRICS.reset(trace_malloc=args.trace_malloc)
+            ARTIFACTS.clear()
+            t0 = time.perf_counter()
+            with redirect_stdout(io.StringIO()) as log:
+                what = state.update(snap)
+                if what is not None:
+                    state.publish()
+            if what is None:
+                continue
+            dt = time.perf_counter() - t0
+            with redirect_stdout(log):
+                state.flush_store()
+            METRICS.save(rows=len(state.table), watch='update')
+            written = [l.strip() for l in log.getvalue().splitlines() if '→' in l]
+            print(f"  {datetime.now():%H:%M:%S} {what} → {dt * 1e3:.0f}ms"
+                  f" (저장소 +{(time.perf_counter() - t0 - dt) * 1e3:.0f}ms)")
+            for l in written:
+                print(f"      {l}")
+    except KeyboardInterrupt:
+        print("\n  감시 종료")
 
 
 # ════════════════════════════════════════
 # 메인 실행
 # ════════════════════════════════════════
 
-def main():
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description='아파트 실거래가 대시보드 생성기')
+    ap.add_argument('--fetch', metavar='SOURCES',
+                    help=f'다운로드 목록 JSON(load_sources 참고)의 CSV 를 {CSV_DIR}/ 로 받은 뒤 진행')
+    ap.add_argument('--fetch-connections', type=int, default=FETCH_CONNECTIONS,
+                    help=f'호스트별 최대 동시 연결 수 (기본 {FETCH_CONNECTIONS})')
+    ap.add_argument('--fetch-per-sido', type=int, default=FETCH_PER_SIDO,
+                    help=f'시도별 동시 다운로드 수 (기본 {FETCH_PER_SIDO})')
+    ap.add_argument('--watch', action='store_true',
+                    help=f'생성 후 종료하지 않고 {CSV_DIR}/ 를 감시하며 바뀐 CSV 만 반영해 다시 생성')
+    ap.add_argument('--rebuild-cache', action='store_true',
+                    help='CSV 파싱 캐시를 무시하고 전체 재파싱')
+    ap.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                    help='CSV 병렬 파싱 프로세스 수 (기본: CPU 코어 수)')
+    ap.add_argument('--stream', action='store_true',
+                    help='거래 테이블 없이 CSV → 집계로 바로 스트리밍 (메모리 절약)')
+    ap.add_argument('--verify-dedup', action='store_true',
+                    help='중복 제거 시 원본 키를 함께 보관해 해시 충돌 정확히 판별')
+    ap.add_argument('--backend', choices=('auto', 'python', 'numpy'), default='auto',
+                    help='집계 구현 (기본 auto: NumPy 가 있으면 numpy, --stream 은 항상 python)')
+    ap.add_argument('--ingest', action='store_true',
+                    help=f'중복 제거된 전체 거래를 SQLite 창고({WAREHOUSE_PATH})에 적재 (query.py 로 조회).'
+                         ' 지난 적재 뒤에 추가된 CSV 만 읽어 새 거래를 덧붙임')
+    ap.add_argument('--from-warehouse', action='store_true',
+                    help='CSV 대신 SQLite 창고의 거래로 대시보드 생성')
+    ap.add_argument('--since', type=int, metavar='YYYYMM',
+                    help='이 계약년월 이후 거래만 CSV 에서 읽음 (이전 달은 월별 집계 저장소에서)')
+    ap.add_argument('--only', metavar='BOARDS',
+                    help=f'쉼표로 구분한 순위표만 생성하고 해당 지역 거래만 읽음'
+                         f' ({",".join(LEADERBOARDS)}), 전국 구별 TOP 10 은 건너뜀')
+    ap.add_argument('--exclude-cancelled', action='store_true',
+                    help='해제사유발생일이 있는 (계약 해제) 거래 제외'
+                         ' (CSV 파싱 캐시를 쓰지 않고, 월별 집계 저장소는 갱신하지 않고 읽기만)')
+    ap.add_argument('--history-months', type=int, default=HISTORY_MONTHS,
+                    help=f'추이 차트에 합칠 월별 집계 저장소 이력 개월 수'
+                         f' (기본 {HISTORY_MONTHS}, 0 = 합치지 않음)')
+    ap.add_argument('--trace-malloc', action='store_true',
+                    help='단계별 tracemalloc 최대 메모리 기록 (느려짐)')
+    ap.add_argument('--chrome-trace', metavar='FILE',
+                    help='단계별 스팬을 Chrome trace-event JSON 으로 저장')
+    args = ap.parse_args(argv)
+    if args.ingest and (args.stream or args.from_warehouse):
+        ap.error('--ingest 는 --stream / --from-warehouse 와 함께 쓸 수 없습니다')
+    if args.watch and (args.stream or args.from_warehouse or args.ingest):
+        ap.error('--watch 는 --stream / --from-warehouse / --ingest 와 함께 쓸 수 없습니다')
+    if args.fetch and args.from_warehouse:
+        ap.error('--fetch 는 --from-warehouse 와 함께 쓸 수 없습니다')
+    if args.only:
+        args.only = args.only.split(',')
+        unknown = [b for b in args.only if b not in LEADERBOARDS]
+        if unknown:
+            ap.error(f'알 수 없는 순위표: {", ".join(unknown)} (가능: {", ".join(LEADERBOARDS)})')
+    if args.since is not None and not (190001 <= args.since <= 299912 and 1 <= args.since % 100 <= 12):
+        ap.error('--since 는 YYYYMM 형식이어야 합니다')
+    filtered = args.since is not None or args.only or args.exclude_cancelled
+    if args.ingest and filtered:
+        ap.error('--ingest 는 --since / --only / --exclude-cancelled 와 함께 쓸 수 없습니다 (창고는 전체 거래)')
+    if args.from_warehouse and args.exclude_cancelled:
+        ap.error('창고에는 해제 여부가 없어 --exclude-cancelled 를 쓸 수 없습니다')
+    return args
+
+
+def row_filter(args):
+    """명령행 옵션 → RowFilter (거를 조건이 없으면 None)"""
+    if args.since is None and not args.only and not args.exclude_cancelled:
+        return None
+    regions = None
+    if args.only:
+        regions = set().union(*(LEADERBOARDS[b][1] for b in args.only))
+    return RowFilter(ym_min=args.since, regions=regions,
+                     exclude_cancelled=args.exclude_cancelled)
+
+
+def update_store(agg, args, months=None, load=True):
+    """
+    월별 집계 저장소: 바뀐 달만 갱신하고, CSV 에 없는 과거 달은 추이용으로 합침
+    (--only 는 일부 지역만, --exclude-cancelled 는 해제 거래를 뺀 집계라 갱신하지 않고 읽기만,
+     --since 이전 달은 여기서 채워짐 — 저장소에 쓰는 필터는 --since 뿐)
+    months: 갱신을 확인할 달 (None = 집계의 모든 달), load: 과거 달 합치기 여부
+    합치는 범위는 집계의 마지막 달 기준 최근 --history-months 개월 (0 이면 합치지 않음)
+    """
+    with METRICS.span('aggregate_store', rows_in=len(agg.cells)) as sp:
+        store = AggregateStore(AGG_STORE_PATH)
+        changed = [] if args.only or args.exclude_cancelled else store.sync(agg, months)
+        extra = []
+        if load and args.history_months > 0:
+            extra = store.load_into(agg, ym_shift(max(agg.months), 1 - args.history_months))
+        store.close()
+        sp.update(months_changed=len(changed), months_loaded=len(extra))
+    print(f"  월별 집계 저장소: {len(changed)}개월 갱신 / 과거 {len(extra)}개월 추가 ({AGG_STORE_PATH})\n")
+    return changed, extra
+
+
+def build_outputs(agg, boards, only=None):
+    """Step 2: 두 대시보드 + 압축본 / 매니페스트 (main 과 --watch 공용)"""
+    # 대시보드 1: 전국 구별 TOP 10
+    if only:
+        # 일부 지역만 읽었으므로 건너뜀 — 기존 산출물은 매니페스트에 그대로 유지
+        ARTIFACTS.extend(previous_artifacts())
+    else:
+        with METRICS.span('build_district_data', rows_in=len(agg.cells)) as sp:
+            sp['rows_out'] = len(build_district_data(agg))
+
+    # 대시보드 2: 서울 TOP 20 등 지역 묶음별 순위표
+    with METRICS.span('build_leaderboards', rows_in=len(agg.best)):
+        build_leaderboards(agg, boards)
+
+    # 정적 산출물 압축본 + 해시 매니페스트
+    with METRICS.span('compress_artifacts', rows_in=len(ARTIFACTS)) as sp:
+        sp['bytes_out'] = sum(v['gz'] for v in write_manifest(ARTIFACTS).values())
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
     print("=" * 60)
     print("  통합 아파트 대시보드 (CSV 버전)")
     print("  (전국 구별 TOP 10 + 서울 TOP 20)")
@@ -943,38 +2997,95 @@ def main():
     os.makedirs(DATA_DIR, exist_ok=True)
     os.makedirs(CSV_DIR, exist_ok=True)
 
+    METRICS.reset(trace_malloc=args.trace_malloc)
+    ARTIFACTS.clear()
+    load_payload_hashes()
+
+    # ── Step 0: CSV 다운로드 (끝난 파일은 바로 파싱 → Step 1 에서 캐시 적중) ──
+    if args.fetch:
+        print("Step 0: CSV 다운로드\n")
+        with METRICS.span('fetch') as sp:
+            cache = None if args.rebuild_cache else CsvCache()
+            sp.update(fetch_csv(load_sources(args.fetch), CSV_DIR, cache, args.workers,
+                                args.fetch_connections, args.fetch_per_sido))
+
     # ── Step 1: CSV 파일에서 전체 데이터 로드 ──
     print("Step 1: CSV 데이터 로드\n")
-    alldata = load_all_csv()
-
-    if len(alldata) == 0:
+    # ── 전체 1회 순회 집계 (최근 6개월 최고가 + 월별 평당가) ──
+    months_6 = {int(m) for m in get_months(6)}
+    if args.since is not None and args.since > min(months_6):
+        print(f"❌ --since {args.since} 가 최근 6개월({min(months_6)}~)보다 늦습니다")
+        exit(1)
+    boards = {b: LEADERBOARDS[b] for b in args.only} if args.only else LEADERBOARDS
+    spec = row_filter(args)
+    if spec is not None:
+        print(f"  조건: {spec}\n")
+    if args.watch:
+        watch(args, boards, spec)
+        return
+    agg = MonthlyAggregate(months_6, DISTRICT_TOP_N,
+                           {name: (codes, n) for name, (_t, codes, n) in boards.items()},
+                           backend=args.backend)
+    dedup = DedupIndex(verify=args.verify_dedup)
+    if args.ingest:
+        # 창고 갱신 (새 CSV 의 새 거래만 덧붙이거나 전체 재적재) → 아래에서 창고로 집계
+        with METRICS.span('ingest') as isp:
+            how, n = ingest_warehouse(args.rebuild_cache, args.workers, args.verify_dedup)
+            isp.update(rows_in=LOAD_STATS['rows_read'], rows_out=n, mode=how)
+        print(f"  → SQLite 창고 {n}건 ({how}, {WAREHOUSE_PATH})\n")
+    if args.from_warehouse or args.ingest:
+        # SQLite 창고(--ingest 로 적재)의 거래를 적재 순서대로 집계
+        if not os.path.exists(WAREHOUSE_PATH):
+            print(f"❌ {WAREHOUSE_PATH} 가 없습니다 (먼저 --ingest 로 적재)")
+            exit(1)
+        with METRICS.span('load+aggregate', source='warehouse') as sp:
+            wh = Warehouse(WAREHOUSE_PATH)
+            rows = wh.iter_rows()
+            agg.feed_rows(rows if spec is None else (r for r in rows if spec.keep(r)))
+            wh.close()
+        n = sum(agg.rows.values())
+        if args.from_warehouse:
+            LOAD_STATS.update(files=0, csv_bytes=0, rows_read=n, rows_unique=n,
+                              cache_hits=0, cache_misses=0)
+        print(f"  → {WAREHOUSE_PATH} 에서 {n}건\n")
+    elif args.stream:
+        # CSV → 중복 제거 → 집계로 바로 흘려보냄 (전체 거래 리스트를 만들지 않음)
+        with METRICS.span('load+aggregate') as sp:
+            agg.feed_rows(iter_transactions(args.rebuild_cache, args.workers, dedup, spec))
+    else:
+        with METRICS.span('load') as sp:
+            table = load_all_csv(args.rebuild_cache, args.workers, dedup, spec)
+        with METRICS.span('aggregate', rows_in=len(table), backend=agg.backend) as asp:
+            agg.feed_table(table)
+            asp['rows_out'] = len(agg.cells)
+        del table
+    sp.update(rows_in=LOAD_STATS['rows_read'], rows_out=LOAD_STATS['rows_unique'],
+              files=LOAD_STATS['files'], cache_hits=LOAD_STATS['cache_hits'],
+              cache_misses=LOAD_STATS['cache_misses'],
+              address_cache=ADDRESS_RESOLVER.stats(),
+              encoding_fallback_files=ENCODING_STATS['fallback_files'])
+
+    total = sum(agg.rows.values())
+    if total == 0:
         print("\n❌ 데이터를 로드하지 못했습니다!")
         exit(1)
 
-    # ── 최근 6개월 데이터 분리 ──
-    months_6 = get_months(6)
-    months_6_set = set(months_6)
-    recent = [
-        it for it in alldata
-        if f"{it['deal_year']}{it['deal_month'].zfill(2)}" in months_6_set
-    ]
-
-    # 서울 데이터 분리
-    alldata_seoul = [it for it in alldata if it['region_code'] in SEOUL_CODES]
-    recent_seoul = [it for it in recent if it['region_code'] in SEOUL_CODES]
+    print(f"  전체: {total}건")
+    print(f"  최근 6개월: {sum(agg.recent.values())}건")
+    print(f"  서울 전체: {sum(agg.rows.get(r, 0) for r in SEOUL_CODES)}건"
+          f" / 최근 6개월: {sum(agg.recent.get(r, 0) for r in SEOUL_CODES)}건\n")
 
-    print(f"  전체: {len(alldata)}건")
-    print(f"  최근 6개월: {len(recent)}건")
-    print(f"  서울 전체: {len(alldata_seoul)}건 / 최근 6개월: {len(recent_seoul)}건\n")
+    update_store(agg, args)
 
     # ── Step 2: 대시보드 생성 ──
     print("Step 2: 대시보드 생성\n")
+    build_outputs(agg, boards, args.only)
 
-    # 대시보드 1: 전국 구별 TOP 10
-    build_district_data(recent, alldata, months_6_set)
-
-    # 대시보드 2: 서울 TOP 20
-    build_seoul_html(recent_seoul, alldata_seoul)
+    METRICS.save(csv_files=LOAD_STATS['files'], csv_bytes=LOAD_STATS['csv_bytes'],
+                 rows=total, stream=args.stream,
+                 filter=repr(spec) if spec is not None else None)
+    if args.chrome_trace:
+        METRICS.save_trace(args.chrome_trace)
 
     print("\n" + "=" * 60)
     print("  ✅ 모든 대시보드 생성 완료!")
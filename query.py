@@ -0,0 +1,144 @@
+"""
+SQLite 거래 창고 조회 (python fetch_all.py --ingest 로 먼저 적재)
+─────────────────────────────────────
+  python query.py top [--region 마포구] [--sido 서울시] [--months 3] [--min-area 59] [-n 20]
+                                      평당가 상위 거래
+  python query.py apt 목동신시가지7 [--region 양천구]
+                                      단지의 전체 거래 (계약일 순)
+  python query.py sql "SELECT ..."    임의 SQL (테이블 tx)
+
+기간: --months N 은 창고의 마지막 계약월 기준 최근 N 개월, --since / --until 은 YYYYMM.
+"""
+
+import argparse
+import os
+import sys
+import time
+import unicodedata
+
+import fetch_all
+
+
+COLUMNS = ('apt_name', 'sido', 'sigungu', 'dong', 'area_m2', 'price',
+           'price_per_pyeong', 'ym', 'deal_day', 'floor', 'build_year')
+
+
+def region_codes(name, sido=None):
+    """시군구 이름(부분 일치) → 지역코드 리스트"""
+    return [code for code, (sd, sgg) in fetch_all.REGIONS.items()
+            if name in sgg and (sido is None or sd == sido)]
+
+
+def period_where(wh, args, where, params):
+    """--months / --since / --until → where 조건 추가"""
+    since, until = args.since, args.until
+    if args.months:
+        last = wh.query("SELECT MAX(ym) FROM tx")[1][0][0] or 0
+        since = fetch_all.ym_shift(last, 1 - args.months)
+    if since:
+        where.append("ym >= ?")
+        params.append(since)
+    if until:
+        where.append("ym <= ?")
+        params.append(until)
+
+
+def region_where(args, where, params):
+    if args.region or args.sido:
+        codes = (region_codes(args.region, args.sido) if args.region else
+                 [c for c, (sd, _) in fetch_all.REGIONS.items() if sd == args.sido])
+        if not codes:
+            sys.exit(f"❌ 지역을 찾을 수 없습니다: {args.sido or ''} {args.region or ''}")
+        where.append(f"region_code IN ({', '.join('?' * len(codes))})")
+        params.extend(codes)
+
+
+def top_sql(wh, args):
+    where, params = [], []
+    region_where(args, where, params)
+    period_where(wh, args, where, params)
+    if args.min_area:
+        where.append("area_m2 >= ?")
+        params.append(args.min_area)
+    sql = f"SELECT {', '.join(COLUMNS)} FROM tx"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY price_per_pyeong DESC, seq LIMIT ?"
+    return sql, params + [args.n]
+
+
+def apt_sql(wh, args):
+    where, params = ["apt_name = ?"], [args.name]
+    region_where(args, where, params)
+    period_where(wh, args, where, params)
+    sql = (f"SELECT {', '.join(COLUMNS)} FROM tx WHERE " + " AND ".join(where)
+           + " ORDER BY ym, CAST(deal_day AS INTEGER), seq")
+    return sql, params
+
+
+def text_width(s):
+    """터미널 표시 폭 (한글 등 전각 문자는 2칸)"""
+    return sum(2 if unicodedata.east_asian_width(ch) in 'WF' else 1 for ch in s)
+
+
+def pad(s, width):
+    return s + ' ' * (width - text_width(s))
+
+
+def print_table(cols, rows):
+    if not rows:
+        print("  (결과 없음)")
+        return
+    cells = [[str(v) for v in r] for r in rows]
+    widths = [max(text_width(c), *(text_width(r[i]) for r in cells)) for i, c in enumerate(cols)]
+    print("  " + "  ".join(pad(c, w) for c, w in zip(cols, widths)))
+    for r in cells:
+        print("  " + "  ".join(pad(v, w) for v, w in zip(r, widths)))
+
+
+def add_filters(p):
+    p.add_argument('--region', help='시군구 이름 (부분 일치, 예: 마포구)')
+    p.add_argument('--sido', help='시도 (예: 서울시)')
+    p.add_argument('--months', type=int, help='최근 N 개월')
+    p.add_argument('--since', type=int, help='시작 계약월 YYYYMM')
+    p.add_argument('--until', type=int, help='끝 계약월 YYYYMM')
+
+
+def main():
+    ap = argparse.ArgumentParser(description='SQLite 거래 창고 조회')
+    ap.add_argument('--db', default=fetch_all.WAREHOUSE_PATH, help='창고 경로')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    t = sub.add_parser('top', help='평당가 상위 거래')
+    add_filters(t)
+    t.add_argument('--min-area', type=float, help='전용면적 하한 (㎡)')
+    t.add_argument('-n', type=int, default=20, help='건수 (기본 20)')
+    a = sub.add_parser('apt', help='단지의 전체 거래')
+    a.add_argument('name', help='단지명 (정확히 일치)')
+    add_filters(a)
+    q = sub.add_parser('sql', help='임의 SQL')
+    q.add_argument('sql')
+    q.add_argument('--explain', action='store_true', help='실행 계획 출력')
+    args = ap.parse_args()
+
+    if not os.path.exists(args.db):
+        sys.exit(f"❌ {args.db} 가 없습니다 (python fetch_all.py --ingest 로 먼저 적재)")
+    wh = fetch_all.Warehouse(args.db)
+    if args.cmd == 'top':
+        sql, params = top_sql(wh, args)
+    elif args.cmd == 'apt':
+        sql, params = apt_sql(wh, args)
+    else:
+        sql, params = args.sql, []
+        if args.explain:
+            sql = "EXPLAIN QUERY PLAN " + sql
+
+    t0 = time.perf_counter()
+    cols, rows = wh.query(sql, params)
+    dt = time.perf_counter() - t0
+    print_table(cols, rows)
+    print(f"\n  {len(rows)}행, {dt * 1e3:.1f}ms")
+    wh.close()
+
+
+if __name__ == '__main__':
+    main()
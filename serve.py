@@ -0,0 +1,403 @@
+"""
+거래 조회 HTTP API (asyncio, 메모리 색인)
+─────────────────────────────────────
+  python serve.py [--host 127.0.0.1] [--port 8765] [--cache 1024]
+
+  GET /top?region=11680&n=50&min_area=84&months=12
+        단지별 최고 평당가 거래 상위 N (단지마다 기간 내 최고 평당가 거래 1건)
+        region: 지역코드 또는 시군구 이름 (쉼표로 여러 개), sido=서울시, board=seoul
+  GET /apt/{단지명}/series?region=11680&months=36&min_area=84
+        단지의 월별 거래 건수 / 평균 / 최고 / 최저 평당가 (지역코드별)
+  GET /regions                        지역코드별 거래 건수
+  GET /health                         데이터 버전, 행 수, 응답 캐시 상태
+
+기간: months=N 은 데이터의 마지막 계약월 기준 최근 N 개월, since / until 은 YYYYMM.
+min_area 는 적재 기준(fetch_all.MIN_AREA) 이상에서만 의미가 있다.
+
+시작할 때 fetch_all.load_all_csv() 를 한 번 읽어 (지역, 월) → 평당가 내림차순 행 번호,
+단지명 → 지역별 행 번호 색인을 만든다. /top 은 해당 구간들을 평당가 순으로 병합하며
+단지별 첫 거래만 골라 N 개가 차면 멈추므로 전국 조회도 일부 행만 본다.
+응답은 ETag (데이터 버전 + 정규화한 요청) 를 달아 If-None-Match 가 같으면 304,
+본문은 LRU 캐시 (--cache 개) 에 보관한다.
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import heapq
+import json
+import math
+import os
+import time
+from array import array
+from collections import defaultdict
+from functools import lru_cache
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import fetch_all
+from query import region_codes
+
+
+MAX_N = 1000
+GZIP_MIN_BYTES = 1024
+KEEPALIVE_TIMEOUT = 30
+MAX_BODY = 1 << 20  # GET 에 붙은 본문은 읽고 버림 (이보다 크면 400)
+BAD_REQUEST = b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n'
+
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed'}
+
+
+class QueryError(Exception):
+    """잘못된 요청 (status 와 메시지를 JSON 으로 응답)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class QueryIndex:
+    """
+    TxTable 위의 조회 색인
+
+      parts: (지역코드, 계약월) → 행 번호 array (평당가 내림차순, 같으면 행 번호 순)
+      apts : 단지명 → {지역코드: 행 번호 array (행 순서)}
+      months: 데이터에 있는 계약월 (정렬)
+    """
+
+    def __init__(self, table):
+        self.table = table
+        ppy, ym = table.ppy, table.ym
+        regions, apts = table.region_pool.values, table.apt_pool.values
+        parts = defaultdict(list)
+        by_apt = defaultdict(lambda: defaultdict(lambda: array('I')))
+        for i in range(len(table)):
+            r = regions[table.region[i]]
+            parts[(r, ym[i])].append(i)
+            by_apt[apts[table.apt[i]]][r].append(i)
+        order = self.order
+        self.parts = {k: array('I', sorted(v, key=order)) for k, v in parts.items()}
+        self.apts = {a: dict(v) for a, v in by_apt.items()}
+        self.months = sorted({m for _r, m in self.parts})
+        self.region_rows = defaultdict(int)
+        for (r, _m), rows in self.parts.items():
+            self.region_rows[r] += len(rows)
+
+    def order(self, i):
+        """병합 순서 키: 평당가 내림차순, 같으면 먼저 나온 거래"""
+        return -self.table.ppy[i], i
+
+    def period(self, months=None, since=None, until=None):
+        """months / since / until → 해당하는 계약월 리스트"""
+        lo, hi = since or 0, until or 999999
+        if months:
+            if not self.months:
+                return []
+            lo = max(lo, fetch_all.ym_shift(self.months[-1], 1 - months))
+        return [m for m in self.months if lo <= m <= hi]
+
+    def top(self, regions, months, min_area, n):
+        """단지별 최고 평당가 거래 상위 n 개의 행 번호"""
+        t = self.table
+        area, region, apt = t.area, t.region, t.apt
+        parts = [self.parts[(r, m)] for r in regions for m in months if (r, m) in self.parts]
+        seen = set()
+        out = []
+        for i in heapq.merge(*parts, key=self.order):
+            if area[i] < min_area:
+                continue
+            k = (region[i], apt[i])
+            if k in seen:
+                continue
+            seen.add(k)
+            out.append(i)
+            if len(out) == n:
+                break
+        return out
+
+    def series(self, name, regions, months, min_area):
+        """{지역코드: [(계약월, 건수, 평균, 최고, 최저), ...]}"""
+        t = self.table
+        ppy, ym, area = t.ppy, t.ym, t.area
+        wanted = set(months)
+        out = {}
+        for r, rows in self.apts.get(name, {}).items():
+            if regions is not None and r not in regions:
+                continue
+            cells = {}
+            for i in rows:
+                m = ym[i]
+                if m not in wanted or area[i] < min_area:
+                    continue
+                p = ppy[i]
+                c = cells.get(m)
+                if c is None:
+                    cells[m] = [1, p, p, p]
+                else:
+                    c[0] += 1
+                    c[1] += p
+                    c[2] = max(c[2], p)
+                    c[3] = min(c[3], p)
+            out[r] = [(m, c, round(s / c), mx, mn) for m, (c, s, mx, mn) in sorted(cells.items())]
+        return out
+
+
+def int_param(params, key, default=None, lo=None, hi=None):
+    v = params.get(key)
+    if v is None or v == '':
+        return default
+    try:
+        v = int(v)
+    except ValueError:
+        raise QueryError(f"{key} 는 정수여야 합니다: {v}")
+    if (lo is not None and v < lo) or (hi is not None and v > hi):
+        raise QueryError(f"{key} 범위 밖: {v}")
+    return v
+
+
+def float_param(params, key, default):
+    v = params.get(key)
+    if v is None or v == '':
+        return default
+    try:
+        v = float(v)
+    except ValueError:
+        raise QueryError(f"{key} 는 숫자여야 합니다: {v}")
+    if not math.isfinite(v):
+        raise QueryError(f"{key} 는 유한한 숫자여야 합니다: {v}")
+    return v
+
+
+def region_param(params):
+    """region / sido / board → 지역코드 집합 (None = 전체)"""
+    codes = set()
+    given = False
+    if params.get('region'):
+        given = True
+        for item in params['region'].split(','):
+            item = item.strip()
+            found = [item] if item in fetch_all.REGIONS else region_codes(item, params.get('sido'))
+            if not found:
+                raise QueryError(f"지역을 찾을 수 없습니다: {item}")
+            codes.update(found)
+    elif params.get('sido'):
+        given = True
+        codes = {c for c, (sd, _) in fetch_all.REGIONS.items() if sd == params['sido']}
+        if not codes:
+            raise QueryError(f"시도를 찾을 수 없습니다: {params['sido']}")
+    if params.get('board'):
+        if params['board'] not in fetch_all.LEADERBOARDS:
+            raise QueryError(f"알 수 없는 순위표: {params['board']}")
+        board = fetch_all.LEADERBOARDS[params['board']][1]
+        codes = codes & board if given else set(board)
+        given = True
+    return codes if given else None
+
+
+class ApiServer:
+    """
+    QueryIndex 를 JSON 으로 제공하는 HTTP/1.1 서버 (keep-alive, GET / HEAD)
+    respond() 는 (경로, 정렬한 파라미터) 단위로 lru_cache — 같은 요청은 본문을 다시 만들지 않는다
+    """
+
+    def __init__(self, index, version, cache_size=1024):
+        self.index = index
+        self.version = version
+        self.respond = lru_cache(maxsize=cache_size)(self._respond)
+        self.requests = 0
+        self.not_modified = 0
+
+    def etag(self, key):
+        h = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:16]
+        return f'"{self.version}-{h}"'
+
+    def _respond(self, path, params):
+        """→ (status, JSON 바이트, gzip 바이트 또는 None)"""
+        try:
+            status, obj = 200, self.route(path, dict(params))
+        except QueryError as e:
+            status, obj = e.status, {'error': str(e)}
+        body = json.dumps(obj, ensure_ascii=False, separators=(',', ':'),
+                          allow_nan=False).encode('utf-8')
+        gz = gzip.compress(body, 6) if len(body) >= GZIP_MIN_BYTES else None
+        return status, body, gz
+
+    def route(self, path, params):
+        idx = self.index
+        parts = [unquote(p) for p in path.strip('/').split('/')]
+        if parts == ['top']:
+            regions = region_param(params)
+            months = idx.period(int_param(params, 'months', lo=1), int_param(params, 'since'),
+                                int_param(params, 'until'))
+            min_area = float_param(params, 'min_area', fetch_all.MIN_AREA)
+            n = int_param(params, 'n', 20, lo=1, hi=MAX_N)
+            rows = idx.top(sorted(regions if regions is not None else idx.region_rows),
+                           months, min_area, n)
+            return {
+                'months': [months[0], months[-1]] if months else [],
+                'min_area': min_area,
+                'n': n,
+                'items': [dict(idx.table.record(i), rank=k + 1) for k, i in enumerate(rows)],
+            }
+        if len(parts) == 3 and parts[0] == 'apt' and parts[2] == 'series':
+            name = parts[1]
+            if name not in idx.apts:
+                raise QueryError(f"단지를 찾을 수 없습니다: {name}", 404)
+            months = idx.period(int_param(params, 'months', lo=1), int_param(params, 'since'),
+                                int_param(params, 'until'))
+            min_area = float_param(params, 'min_area', fetch_all.MIN_AREA)
+            series = idx.series(name, region_param(params), months, min_area)
+            return {
+                'apt_name': name,
+                'regions': [{
+                    'region_code': r,
+                    'sido': fetch_all.REGIONS.get(r, ('', ''))[0],
+                    'sigungu': fetch_all.REGIONS.get(r, ('', ''))[1],
+                    'series': [dict(zip(('ym', 'count', 'avg', 'max', 'min'), row)) for row in rows],
+                } for r, rows in sorted(series.items())],
+            }
+        if parts == ['regions']:
+            return {'regions': [{
+                'region_code': r,
+                'sido': fetch_all.REGIONS.get(r, ('', ''))[0],
+                'sigungu': fetch_all.REGIONS.get(r, ('', ''))[1],
+                'deals': n,
+            } for r, n in sorted(idx.region_rows.items())]}
+        if parts == ['health']:
+            ci = self.respond.cache_info()
+            return {'version': self.version, 'rows': len(idx.table),
+                    'months': [idx.months[0], idx.months[-1]] if idx.months else [],
+                    'cache': {'hits': ci.hits, 'misses': ci.misses, 'size': ci.currsize}}
+        raise QueryError(f"없는 경로: {path}", 404)
+
+    def handle_request(self, method, target, headers):
+        """→ (status, 응답 헤더 dict, 본문)"""
+        self.requests += 1
+        if method not in ('GET', 'HEAD'):
+            return 405, {'Allow': 'GET, HEAD'}, b''
+        url = urlsplit(target)
+        key = (url.path, tuple(sorted(parse_qsl(url.query))))
+        etag = self.etag(key)
+        # /health 는 캐시 통계가 바뀌므로 ETag / 캐시 없이
+        if url.path.rstrip('/') == '/health':
+            status, body, gz = self._respond(*key)
+            return status, {'Content-Type': 'application/json; charset=utf-8',
+                            'Cache-Control': 'no-store'}, body
+        hdrs = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag in (t.strip() for t in headers.get('if-none-match', '').split(',')):
+            self.not_modified += 1
+            return 304, hdrs, b''
+        status, body, gz = self.respond(*key)
+        hdrs['Content-Type'] = 'application/json; charset=utf-8'
+        hdrs['Vary'] = 'Accept-Encoding'
+        if gz is not None and 'gzip' in headers.get('accept-encoding', ''):
+            hdrs['Content-Encoding'] = 'gzip'
+            body = gz
+        if status != 200:
+            del hdrs['ETag']
+        return status, hdrs, body
+
+    @staticmethod
+    async def read_request(reader, line):
+        """
+        요청 줄 다음의 헤더 / 본문까지 읽기 → (method, target, version, headers)
+        형식 오류 (요청 줄, 숫자가 아니거나 음수인 Content-Length) 는 ValueError,
+        한도(64KB)를 넘는 줄은 readline() 이 ValueError 로 알린다
+        """
+        method, target, version = line.decode('utf-8', 'replace').split()
+        headers = {}
+        while True:
+            h = await reader.readline()
+            if h in (b'\r\n', b'\n', b''):
+                break
+            k, _, v = h.decode('latin-1').partition(':')
+            headers[k.strip().lower()] = v.strip()
+        if headers.get('content-length'):
+            n = int(headers['content-length'])
+            if not 0 <= n <= MAX_BODY:
+                raise ValueError(f"Content-Length 범위 밖: {n}")
+            await reader.readexactly(n)
+        return method, target, version, headers
+
+    async def handle(self, reader, writer):
+        """연결 하나 (keep-alive 로 여러 요청)"""
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), KEEPALIVE_TIMEOUT)
+                    if not line:
+                        break
+                    method, target, version, headers = await self.read_request(reader, line)
+                except asyncio.TimeoutError:
+                    break
+                except (ValueError, asyncio.LimitOverrunError):
+                    writer.write(BAD_REQUEST)
+                    await writer.drain()
+                    break
+
+                status, hdrs, body = self.handle_request(method, target, headers)
+                keep = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                        f"Content-Length: {len(body)}",
+                        f"Connection: {'keep-alive' if keep else 'close'}"]
+                head += [f"{k}: {v}" for k, v in hdrs.items()]
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+                if method != 'HEAD':
+                    writer.write(body)
+                await writer.drain()
+                if not keep:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port, ready=None):
+        server = await asyncio.start_server(self.handle, host, port)
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+
+def data_version(table):
+    """CSV 목록 (경로, 크기, mtime) + 행 수 → 짧은 해시 (ETag 앞부분)"""
+    h = hashlib.sha1(str(len(table)).encode())
+    for path in sorted(fetch_all.glob.glob(os.path.join(fetch_all.CSV_DIR, '*.csv'))):
+        st = os.stat(path)
+        h.update(f"{path}\0{st.st_size}\0{st.st_mtime_ns}\n".encode('utf-8'))
+    return h.hexdigest()[:10]
+
+
+def load_index(rebuild_cache=False, workers=1):
+    """load_all_csv → (QueryIndex, 데이터 버전)"""
+    table = fetch_all.load_all_csv(rebuild_cache, workers)
+    t0 = time.perf_counter()
+    index = QueryIndex(table)
+    print(f"  → 색인 {len(index.parts):,}개 구간 / 단지 {len(index.apts):,}개"
+          f" ({(time.perf_counter() - t0) * 1e3:.0f}ms)")
+    return index, data_version(table)
+
+
+def main():
+    ap = argparse.ArgumentParser(description='거래 조회 HTTP API')
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8765)
+    ap.add_argument('--cache', type=int, default=1024, help='응답 LRU 캐시 크기 (기본 1024)')
+    ap.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                    help='CSV 병렬 파싱 프로세스 수 (기본: CPU 코어 수)')
+    ap.add_argument('--rebuild-cache', action='store_true', help='CSV 파싱 캐시 무시')
+    args = ap.parse_args()
+
+    index, version = load_index(args.rebuild_cache, args.workers)
+    api = ApiServer(index, version, args.cache)
+    ready = lambda port: print(f"🌐 http://{args.host}:{port}/top?n=20 (버전 {version}, Ctrl+C 로 종료)")
+    try:
+        asyncio.run(api.serve(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        print(f"\n  종료 (요청 {api.requests}건, 304 {api.not_modified}건)")
+
+
+if __name__ == '__main__':
+    main()